@@ -0,0 +1,178 @@
+# Benchmarks of the graph primitives, the matching, the rewire routine, the data set reader and the three
+# algorithms, on fixed data sets from the Tests directory. The results are saved by git commit so that two
+# commits can be compared:
+#   python3 Benchmarks.py [--tiers small medium large] [--repeat 3]   runs the benchmarks and saves the results
+#   python3 Benchmarks.py compare OLD NEW                              compares the saved results of two commits
+# Every run first checks that importing the modules does not load the plotting libraries, which only Graph.draw needs.
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+
+import Graph as G
+import Tests
+from Koch2011 import Koch2011
+from camacho2010 import Camacho2010
+from max_matching import Match
+from tirodkar import Tirodkar2017
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+TIERS = {
+    "small": "Tests/TEST_10_50_5.txt",
+    "medium": "Tests/TEST_100_50_10.txt",
+    "large": "Tests/TEST_1000_30_17.txt",
+}
+RESULTS_FILE = os.path.join(DIRECTORY, "benchmark-results.json")
+SEED = 0
+# the number of edges removed and added again, and the number of swaps, per run of the primitive benchmarks
+OPERATIONS = 1000
+# modules that a run without drawing must not import
+PLOTTING_MODULES = ("matplotlib", "networkx")
+
+
+def benchmarks(graph, fileName):
+    # (name, setup, stmt, operations) for every benchmark on graph; setup runs before every repeat and its
+    # result is passed to stmt, and the time of a repeat is divided by its number of operations
+    rng = random.Random(SEED)
+    edges = rng.sample(range(graph.m()), min(OPERATIONS, graph.m()))
+    vertices = graph.vertices_by_index(rng.sample(list(graph.vertices.keys()), graph.n() // 2))
+    matchingEdges = [(edge.v1.index, edge.v2.index) for edge in graph.edges] + [(edge.v2.index, edge.v1.index) for edge in graph.edges]
+    state = {}
+
+    def copyWithEdges():
+        state["graph"] = graph.copy()
+        state["edges"] = [state["graph"].edges[i] for i in edges]
+
+    def removeEdges():
+        for edge in state["edges"]:
+            state["graph"].removeEdge(edge)
+
+    def copyWithoutEdges():
+        copyWithEdges()
+        removeEdges()
+
+    def addEdges():
+        newGraph = state["graph"]
+        for edge in state["edges"]:
+            newGraph.addEdge(edge.v1, edge.v2, edge.colour)
+
+    def rewire():
+        G.Rewirer(state["graph"], SEED).rewire(len(edges))
+
+    return [
+        ("Graph.removeEdge", copyWithEdges, removeEdges, len(edges)),
+        ("Graph.addEdge", copyWithoutEdges, addEdges, len(edges)),
+        ("Graph.copy", None, graph.copy, 1),
+        ("Graph.induced_sub_graph", None, lambda: graph.induced_sub_graph(vertices), 1),
+        ("Match.maximum_matching", None, lambda: Match.from_edges(graph.n(), matchingEdges).maximum_matching(), 1),
+        ("rewire", copyWithEdges, rewire, len(edges)),
+        ("readTestData", None, lambda: Tests.readTestData(fileName), 1),
+        ("Koch2011", None, lambda: Koch2011(graph), 1),
+        ("Camacho2010", None, lambda: Camacho2010(graph), 1),
+        ("Tirodkar2017", None, lambda: Tirodkar2017(graph), 1),
+    ]
+
+
+def importTime(repeat):
+    # the best time to import Tests and this module in a fresh interpreter, as every worker process does;
+    # exits if the import loaded one of the PLOTTING_MODULES
+    code = ("import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import Tests, Benchmarks\n"
+            "print(time.perf_counter() - start)\n"
+            "print(' '.join(sys.modules))\n")
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], cwd=DIRECTORY, capture_output=True, text=True, check=True).stdout.split("\n")
+        times.append(float(output[0]))
+        modules = output[1].split()
+        for module in PLOTTING_MODULES:
+            if module in modules:
+                sys.exit(f"importing Tests loads {module}; it should only be imported when a graph is drawn")
+    print(f"{'startup':8} {'import Tests':25} {min(times):.3e} s")
+    return min(times)
+
+
+def runBenchmarks(tiers, repeat):
+    # the best time of each benchmark in seconds per operation, by tier
+    results = {}
+    for tier in tiers:
+        fileName = os.path.join(DIRECTORY, TIERS[tier])
+        graph = Tests.readTestData(fileName)[0][0]
+        results[tier] = {}
+        for name, setup, stmt, operations in benchmarks(graph, fileName):
+            timer = timeit.Timer(stmt, setup if setup is not None else "pass")
+            best = min(timer.repeat(repeat=repeat, number=1))
+            results[tier][name] = best / operations
+            print(f"{tier:8} {name:25} {best / operations:.3e} s")
+    return results
+
+
+def gitCommit():
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=DIRECTORY, capture_output=True, text=True).stdout.strip()
+    dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=DIRECTORY).returncode != 0
+    return commit + "-dirty" if dirty else commit
+
+
+def readResults():
+    if not os.path.isfile(RESULTS_FILE):
+        return {}
+    file = open(RESULTS_FILE, "r")
+    results = json.load(file)
+    file.close()
+    return results
+
+
+def saveResults(commit, results):
+    # tiers run separately for the same commit are kept together
+    allResults = readResults()
+    entry = allResults.setdefault(commit, {"results": {}})
+    entry["date"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    entry["python"] = platform.python_version()
+    entry["machine"] = platform.machine()
+    entry["results"].update(results)
+    file = open(RESULTS_FILE, "w")
+    json.dump(allResults, file, indent=2, sort_keys=True)
+    file.close()
+
+
+def compare(oldCommit, newCommit):
+    # the ratio new / old of every benchmark both commits ran; above 1 is slower
+    allResults = readResults()
+    for commit in (oldCommit, newCommit):
+        if commit not in allResults:
+            sys.exit(f"no benchmark results for {commit} in {RESULTS_FILE}")
+    old = allResults[oldCommit]["results"]
+    new = allResults[newCommit]["results"]
+    for tier in ["startup"] + list(TIERS):
+        if tier in old and tier in new:
+            for name in new[tier]:
+                if name in old[tier]:
+                    ratio = new[tier][name] / old[tier][name]
+                    print(f"{tier:8} {name:25} {old[tier][name]:.3e} s -> {new[tier][name]:.3e} s  x{ratio:.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        if len(sys.argv) != 4:
+            sys.exit("usage: python3 Benchmarks.py compare OLD NEW")
+        compare(sys.argv[2], sys.argv[3])
+        sys.exit()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=list(TIERS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    commit = gitCommit()
+    startup = importTime(args.repeat)
+    results = runBenchmarks(args.tiers, args.repeat)
+    results["startup"] = {"import Tests": startup}
+    saveResults(commit, results)
+    print(f"results saved for {commit} in {RESULTS_FILE}")
@@ -0,0 +1,346 @@
+from collections.abc import Mapping, Sequence
+from typing import Iterable
+
+import numpy as np
+
+import Graph
+
+
+class CompactVertex:
+    # a lightweight view of vertex `index` in a CompactGraph
+    __slots__ = ("graph", "index")
+
+    def __init__(self, graph, index):
+        self.graph = graph
+        self.index = index
+
+    # positions of this vertex's entries in the CSR arrays
+    @property
+    def _slice(self):
+        ptr = self.graph.adj_ptr
+        return slice(ptr[self.index], ptr[self.index + 1])
+
+    def degree(self):
+        return int(self.graph.adj_ptr[self.index + 1] - self.graph.adj_ptr[self.index])
+
+    @property
+    def incidentEdges(self):
+        return [CompactEdge(self.graph, int(e)) for e in self.graph.adj_edge[self._slice]]
+
+    @property
+    def neighbours(self):
+        return {CompactVertex(self.graph, int(u)) for u in self.graph.adj_nbr[self._slice]}
+
+    @property
+    def colours(self):
+        colours = dict()
+        for edge in self.incidentEdges:
+            colours.setdefault(edge.colour, set()).add(edge)
+        return colours
+
+    @property
+    def colour_degree(self):
+        return len(np.unique(self.graph.colour_code[self.graph.adj_edge[self._slice]]))
+
+    def colour_degree_into_sub_graph(self, vertices):
+        return len(self.colours_into_sub_graph(vertices))
+
+    def _edge_ids_into_sub_graph(self, vertices):
+        member = self.graph._membership(vertices)
+        s = self._slice
+        return self.graph.adj_edge[s][member[self.graph.adj_nbr[s]]]
+
+    def colours_into_sub_graph(self, vertices):
+        return set(self.graph.colour[self._edge_ids_into_sub_graph(vertices)].tolist())
+
+    def edges_into_sub_graph(self, vertices):
+        return [CompactEdge(self.graph, int(e)) for e in self._edge_ids_into_sub_graph(vertices)]
+
+    def __eq__(self, other):
+        return isinstance(other, CompactVertex) and self.graph is other.graph and self.index == other.index
+
+    def __hash__(self):
+        return hash(self.index)
+
+    def __str__(self):
+        return f"<{self.index}>"
+
+    def __repr__(self):
+        return f"<{self.index}>"
+
+
+class CompactEdge:
+    # a lightweight view of edge `id` in a CompactGraph
+    __slots__ = ("graph", "id")
+
+    def __init__(self, graph, id):
+        self.graph = graph
+        self.id = id
+
+    @property
+    def v1(self):
+        return CompactVertex(self.graph, int(self.graph.v1[self.id]))
+
+    @property
+    def v2(self):
+        return CompactVertex(self.graph, int(self.graph.v2[self.id]))
+
+    @property
+    def colour(self):
+        return int(self.graph.colour[self.id])
+
+    def __eq__(self, other):
+        return isinstance(other, CompactEdge) and self.graph is other.graph and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __bool__(self):
+        return True
+
+    def __str__(self):
+        return f"({self.v1}, {self.v2}, {self.colour})"
+
+    def __repr__(self):
+        return f"({self.v1}, {self.v2}, {self.colour})"
+
+
+class _VertexMap(Mapping):
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.graph.n():
+            raise KeyError(index)
+        return CompactVertex(self.graph, int(index))
+
+    def __iter__(self):
+        return iter(range(self.graph.n()))
+
+    def __len__(self):
+        return self.graph.n()
+
+
+class _EdgeList(Sequence):
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return CompactEdge(self.graph, i)
+
+    def __len__(self):
+        return self.graph.m()
+
+
+class _ColourMap(Mapping):
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    # every lookup returns a fresh set, so callers may pop from it and add back
+    def __getitem__(self, colour):
+        edge_ids = self.graph.colour_edge_ids(colour)
+        if len(edge_ids) == 0:
+            raise KeyError(colour)
+        return {CompactEdge(self.graph, int(e)) for e in edge_ids}
+
+    def __iter__(self):
+        return iter(self.graph.colour_values.tolist())
+
+    def __len__(self):
+        return len(self.graph.colour_values)
+
+
+class CompactRainbowCoverage:
+    # Graph.RainbowCoverage for a CompactGraph: colour counts are indexed by dense colour number
+    def __init__(self, graph, vertices=()):
+        self.graph = graph
+        self.member = np.zeros(graph.n(), dtype=bool)
+        self.colour_counts = np.zeros(graph.num_colours, dtype=np.int64)
+        self._num_colours = 0
+        self.update(vertices)
+
+    def add(self, vertex):
+        if self.member[vertex.index]:
+            return
+        s = vertex._slice
+        codes = self.graph.colour_code[self.graph.adj_edge[s][self.member[self.graph.adj_nbr[s]]]]
+        new_codes = np.unique(codes)
+        self._num_colours += int(np.count_nonzero(self.colour_counts[new_codes] == 0))
+        np.add.at(self.colour_counts, codes, 1)
+        self.member[vertex.index] = True
+
+    def update(self, vertices):
+        for vertex in vertices:
+            self.add(vertex)
+
+    @property
+    def colours(self):
+        return set(self.graph.colour_values[self.colour_counts > 0].tolist())
+
+    def __len__(self):
+        return self._num_colours
+
+
+class CompactGraph:
+    # a read-only graph on vertices 0..n-1 stored as numpy arrays:
+    #   v1, v2, colour      the edge list, in input order
+    #   adj_ptr, adj_edge   CSR index: the edges incident to vertex i are adj_edge[adj_ptr[i]:adj_ptr[i+1]]
+    #   adj_nbr             the neighbour across each CSR entry
+    #   colour_ptr          the edges of colour_values[c] are colour_order[colour_ptr[c]:colour_ptr[c+1]]
+    # The edge arrays are used as given when they are already int32, so memory-mapped data is not copied.
+    def __init__(self, n, v1, v2, colour, maxColour=None, name=None):
+        self.name = name
+        self.maxColour = maxColour
+        self._n = int(n)
+        self.v1 = np.asarray(v1, dtype=np.int32)
+        self.v2 = np.asarray(v2, dtype=np.int32)
+        self.colour = np.asarray(colour, dtype=np.int32)
+        m = len(self.colour)
+        assert len(self.v1) == m and len(self.v2) == m
+
+        # CSR adjacency, each edge appears once from each endpoint
+        edge_ids = np.arange(m, dtype=np.int32)
+        ends = np.concatenate((self.v1, self.v2))
+        others = np.concatenate((self.v2, self.v1))
+        order = np.argsort(ends, kind="stable")
+        self.adj_edge = np.concatenate((edge_ids, edge_ids))[order]
+        self.adj_nbr = others[order]
+        self.adj_ptr = np.zeros(self._n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ends, minlength=self._n), out=self.adj_ptr[1:])
+
+        # per-colour edge ranges; colour_code maps each edge to a dense colour number
+        self.colour_values, self.colour_code = np.unique(self.colour, return_inverse=True)
+        self.colour_code = self.colour_code.astype(np.int32)
+        self.colour_order = np.argsort(self.colour_code, kind="stable").astype(np.int32)
+        self.colour_ptr = np.zeros(len(self.colour_values) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.colour_code, minlength=len(self.colour_values)), out=self.colour_ptr[1:])
+
+        self._graph = None
+        self.vertices = _VertexMap(self)
+        self.edges = _EdgeList(self)
+        self.colours = _ColourMap(self)
+
+    @classmethod
+    def from_edges(cls, n, edges, maxColour=None, name=None):
+        edges = np.asarray(edges, dtype=np.int32).reshape(-1, 3)
+        return cls(n, edges[:, 0], edges[:, 1], edges[:, 2], maxColour=maxColour, name=name)
+
+    @classmethod
+    def from_graph(cls, graph: Graph.Graph):
+        assert sorted(graph.vertices.keys()) == list(range(graph.n())), "vertices must be numbered 0..n-1"
+        edges = [(edge.v1.index, edge.v2.index, edge.colour) for edge in graph.edges]
+        return cls.from_edges(graph.n(), edges, maxColour=graph.maxColour, name=graph.name)
+
+    def to_graph(self):
+        edges = zip(self.v1.tolist(), self.v2.tolist(), self.colour.tolist())
+        return Graph.Graph.from_edges(self._n, edges, self.maxColour, name=self.name)
+
+    # the algorithms that modify their input work on a mutable copy
+    def copy(self):
+        return self.to_graph()
+
+    # views share one mutable Graph, which is built the first time a view is asked for
+    def view(self):
+        if self._graph is None:
+            self._graph = self.to_graph()
+        return self._graph.view()
+
+    # get the number of vertices in the graph
+    def n(self):
+        return self._n
+
+    # get the number of edges in the graph
+    def m(self):
+        return len(self.colour)
+
+    @property
+    def num_colours(self):
+        return len(self.colour_values)
+
+    def colour_edge_ids(self, colour):
+        c = np.searchsorted(self.colour_values, colour)
+        if c == len(self.colour_values) or self.colour_values[c] != colour:
+            return self.colour_order[:0]
+        return self.colour_order[self.colour_ptr[c]:self.colour_ptr[c + 1]]
+
+    def vertices_by_index(self, indices: Iterable[int]):
+        return [self.vertices[index] for index in indices]
+
+    # boolean array over the vertices, True for members of `vertices`
+    def _membership(self, vertices):
+        member = np.zeros(self._n, dtype=bool)
+        member[[v.index for v in vertices]] = True
+        return member
+
+    # number of distinct colours on the CSR entries selected by `mask`, per vertex
+    def _colour_degrees(self, mask=None):
+        ends = np.repeat(np.arange(self._n, dtype=np.int64), np.diff(self.adj_ptr))
+        codes = self.colour_code[self.adj_edge]
+        if mask is not None:
+            ends, codes = ends[mask], codes[mask]
+        pairs = np.unique(ends * self.num_colours + codes)
+        return np.bincount(pairs // max(self.num_colours, 1), minlength=self._n)
+
+    def max_colour_degree(self):
+        return self.vertices[int(np.argmax(self._colour_degrees()))]
+
+    def max_colour_degree_into_subgraph(self, sub_vertices, from_vertices=None):
+        member = self._membership(sub_vertices)
+        degrees = self._colour_degrees(member[self.adj_nbr])
+        if from_vertices:
+            candidates = np.array([v.index for v in from_vertices], dtype=np.int64)
+            return self.vertices[int(candidates[np.argmax(degrees[candidates])])]
+        return self.vertices[int(np.argmax(degrees))]
+
+    def _edge_ids_of_subgraph(self, sub_vertices):
+        member = self._membership(sub_vertices)
+        return np.flatnonzero(member[self.v1] & member[self.v2])
+
+    def distinct_colours_of_subgraph(self, sub_vertices):
+        return set(self.colour[self._edge_ids_of_subgraph(sub_vertices)].tolist())
+
+    def coverage(self, sub_vertices=()):
+        return CompactRainbowCoverage(self, sub_vertices)
+
+    def induced_sub_graph(self, sub_vertices):
+        sub_vertices = list(sub_vertices)
+        ids = self._edge_ids_of_subgraph(sub_vertices)
+        edges = zip(self.v1[ids].tolist(), self.v2[ids].tolist(), self.colour[ids].tolist())
+        return Graph.Graph.from_edges([vertex.index for vertex in sub_vertices], edges, name=f"{self.name}-sub")
+
+    def vertex_colours(self, vertex):
+        return vertex.colours
+
+    colour_adjacency = Graph.Graph.colour_adjacency
+    _path_through = staticmethod(Graph.Graph._path_through)
+
+    def find_adjacent_vertices_with_colours(self, c1, c2):
+        ids1 = self.colour_edge_ids(c1)
+        ids2 = self.colour_edge_ids(c2)
+        ends1 = np.concatenate((self.v1[ids1], self.v2[ids1]))
+        ends2 = np.concatenate((self.v1[ids2], self.v2[ids2]))
+        for x in np.intersect1d(ends1, ends2).tolist():
+            # the far ends of the c1 and c2 edges at x; any two different ones give a path
+            far1 = set(np.concatenate((self.v2[ids1][self.v1[ids1] == x], self.v1[ids1][self.v2[ids1] == x])).tolist())
+            far2 = set(np.concatenate((self.v2[ids2][self.v1[ids2] == x], self.v1[ids2][self.v2[ids2] == x])).tolist())
+            for a in far1:
+                for b in far2:
+                    if a != b:
+                        return {self.vertices[x], self.vertices[a], self.vertices[b]}
+        return None
+
+    # check if vertices u and v are connected by at least one edge
+    def adjacent(self, u, v):
+        return bool(np.any(self.adj_nbr[u._slice] == v.index))
+
+    def adjacency_matrix(self):
+        return Graph.AdjacencyMatrix(range(self._n), zip(self.v1.tolist(), self.v2.tolist()))
@@ -1,76 +1,202 @@
+import heapq
 import random
 from collections import defaultdict
+from collections.abc import Mapping, Set
 from typing import List, Dict, Iterable
 
-import networkx as nx
-from matplotlib import pyplot as plt
+
+# Sets of colours are also kept as colour masks: ints with bit c set for colour c, so colours must be
+# non-negative ints. A union is |, and the number of colours is bit_count().
+def colour_mask(colours: Iterable[int]):
+    mask = 0
+    for colour in colours:
+        mask |= 1 << colour
+    return mask
+
+
+# the positions of the set bits of a mask, lowest first
+def mask_bits(mask):
+    bits = []
+    while mask:
+        low = mask & -mask
+        bits.append(low.bit_length() - 1)
+        mask ^= low
+    return bits
+
+
+mask_colours = mask_bits
+
+
+def first_edge(edges):
+    # the edge with the smallest endpoint indices, then the smallest colour; a choice that does not depend on the
+    # edge ids, so a copy of a graph with other ids picks the same edge
+    return min(edges, key=lambda edge: (min(edge.v1.index, edge.v2.index), max(edge.v1.index, edge.v2.index), edge.colour))
+
+
+class _EdgeSet(Set):
+    # the edges whose ids are in the set `ids`, looked up in a graph's edge table
+    __slots__ = ("table", "ids")
+
+    def __init__(self, table, ids):
+        self.table = table
+        self.ids = ids
+
+    @classmethod
+    def _from_iterable(cls, edges):
+        return set(edges)
+
+    def __contains__(self, edge):
+        return isinstance(edge, Edge) and edge.id in self.ids and self.table[edge.id] is edge
+
+    def __iter__(self):
+        table = self.table
+        return (table[i] for i in self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return repr(set(self))
+
+
+class _EdgeSetMap(Mapping):
+    # a map of key -> set of edge ids, with the sets given as _EdgeSets
+    __slots__ = ("table", "groups")
+
+    def __init__(self, table, groups):
+        self.table = table
+        self.groups = groups
+
+    def __getitem__(self, key):
+        if key not in self.groups:
+            raise KeyError(key)
+        return _EdgeSet(self.table, self.groups[key])
+
+    def __iter__(self):
+        return iter(self.groups)
+
+    def __len__(self):
+        return len(self.groups)
+
+
+class _IncidentEdgeSet(Set):
+    # the edges incident to a vertex, which are the edges of all its colours
+    __slots__ = ("vertex",)
+
+    def __init__(self, vertex):
+        self.vertex = vertex
+
+    @classmethod
+    def _from_iterable(cls, edges):
+        return set(edges)
+
+    def __contains__(self, edge):
+        return isinstance(edge, Edge) and edge in self.vertex.colours.get(edge.colour, ())
+
+    def __iter__(self):
+        table = self.vertex._edge_table
+        return (table[i] for ids in self.vertex._colours.values() for i in ids)
+
+    def __len__(self):
+        return self.vertex._degree
+
+    def __repr__(self):
+        return repr(set(self))
 
 
 class Vertex:
+    # Edges are kept by id: the maps below hold edge ids, which index `_edge_table`, the edge table of
+    # the graph the vertex belongs to, and incidentEdges and colours give the Edge objects.
+    # _colours maps a colour to the set of ids of the edges of that colour, and _neighbours maps a
+    # neighbour to a tuple of the ids of the edges to it (which has more than one id only for multiple edges).
+    __slots__ = ("index", "_edge_table", "_degree", "_neighbours", "_colours", "colour_mask")
+
     # create a vertex
-    def __init__(self, index):
+    def __init__(self, index, edge_table=None):
         self.index = index
-        self.incidentEdges = set()
-        self._neighbours = defaultdict(set)
+        self._edge_table = [] if edge_table is None else edge_table
+        self._degree = 0
+        self._neighbours = dict()
         self._colours = defaultdict(set)
+        # the colour mask of the incident edges
+        self.colour_mask = 0
 
+    @property
+    def incidentEdges(self):
+        return _IncidentEdgeSet(self)
+
+    # a live view of the neighbours, which is not copied
     @property
     def neighbours(self):
-        return set(self._neighbours.keys())
+        return self._neighbours.keys()
     # check how many edges this vertex is incident to
     def degree(self):
-        return len(self.incidentEdges)
+        return self._degree
 
     @property
     def colours(self):
-        return self._colours
+        return _EdgeSetMap(self._edge_table, self._colours)
 
     @property
     def colour_degree(self):
         return len(self._colours)
 
     def colour_degree_into_sub_graph(self, vertices):
-        return len(self.colours_into_sub_graph(vertices))
+        return self.colour_mask_into_sub_graph(vertices).bit_count()
 
     def colours_into_sub_graph(self, vertices):
-        colours = set()
-        for vertex in vertices:
-            for edge in self._neighbours.get(vertex, []):
-                colours.add(edge.colour)
-        return colours
+        table = self._edge_table
+        return {table[i].colour for i in self.edge_ids_into_sub_graph(vertices)}
+
+    def colour_mask_into_sub_graph(self, vertices):
+        table = self._edge_table
+        mask = 0
+        for i in self.edge_ids_into_sub_graph(vertices):
+            mask |= 1 << table[i].colour
+        return mask
 
     def edges_into_sub_graph(self, vertices):
-        edges = list()
+        table = self._edge_table
+        return [table[i] for i in self.edge_ids_into_sub_graph(vertices)]
+
+    def edge_ids_into_sub_graph(self, vertices):
+        ids = list()
+        # walk whichever side is smaller when `vertices` supports fast membership tests
+        if isinstance(vertices, (set, frozenset)) and len(self._neighbours) < len(vertices):
+            for vertex, vertex_ids in self._neighbours.items():
+                if vertex in vertices:
+                    ids.extend(vertex_ids)
+            return ids
         for vertex in vertices:
-            for edge in self._neighbours.get(vertex, []):
-                edges.append(edge)
-        return edges
+            vertex_ids = self._neighbours.get(vertex)
+            if vertex_ids:
+                ids.extend(vertex_ids)
+        return ids
 
 
     # add a new edge we are incident to
     def addEdge(self, newEdge):
         assert (newEdge.v1 is self or newEdge.v2 is self)
-        self.incidentEdges.add(newEdge)
-        self._colours[newEdge.colour].add(newEdge)
-        if newEdge.v1 is self:
-            self._neighbours[newEdge.v2].add(newEdge)
-        else:
-            self._neighbours[newEdge.v1].add(newEdge)
+        assert self._edge_table[newEdge.id] is newEdge
+        self._degree += 1
+        self._colours[newEdge.colour].add(newEdge.id)
+        self.colour_mask |= 1 << newEdge.colour
+        neighbour = newEdge.v2 if newEdge.v1 is self else newEdge.v1
+        self._neighbours[neighbour] = self._neighbours.get(neighbour, ()) + (newEdge.id,)
 
     def removeEdge(self, edge):
         assert (edge.v1 is self or edge.v2 is self)
-        self.incidentEdges.remove(edge)
-        self._colours[edge.colour].remove(edge)
+        self._colours[edge.colour].remove(edge.id)
+        self._degree -= 1
         if len(self._colours[edge.colour]) == 0:
             del self._colours[edge.colour]
-        if edge.v1 is self:
-            self._neighbours[edge.v2].remove(edge)
-            if len(self._neighbours[edge.v2]) == 0:
-                del self._neighbours[edge.v2]
+            self.colour_mask &= ~(1 << edge.colour)
+        neighbour = edge.v2 if edge.v1 is self else edge.v1
+        ids = tuple(i for i in self._neighbours[neighbour] if i != edge.id)
+        if ids:
+            self._neighbours[neighbour] = ids
         else:
-            self._neighbours[edge.v1].remove(edge)
-            if len(self._neighbours[edge.v1]) == 0:
-                del self._neighbours[edge.v1]
+            del self._neighbours[neighbour]
 
     def __str__(self):
         return f"<{self.index}>"
@@ -80,9 +206,12 @@ class Vertex:
 
 
 class Edge:
+    # `id` is the position of the edge in its graph's edge table; it never changes and is not reused
+    __slots__ = ("id", "v1", "v2", "colour")
 
     # create an edge between v1 and v2 with a specific colour
-    def __init__(self, v1: Vertex, v2: Vertex, colour):
+    def __init__(self, v1: Vertex, v2: Vertex, colour, id=None):
+        self.id = id
         self.v1: Vertex = v1
         self.v2: Vertex = v2
         self.colour = colour
@@ -92,7 +221,7 @@ class Edge:
                (self.v1 == other.v1 and self.v2 == other.v2) or (self.v1 == other.v2 and self.v2 == other.v1)
 
     def __hash__(self):
-        return hash(id(self))
+        return self.id
 
     def __bool__(self):
         return True
@@ -104,6 +233,135 @@ class Edge:
         return f"({self.v1}, {self.v2}, {self.colour})"
 
 
+class IndexedSet:
+    # a list of distinct items with O(1) append and remove: each item's position is kept in a dict,
+    # and removing an item moves the last item into its place, so the order stays deterministic
+    def __init__(self, items=()):
+        self._items = list(items)
+        self._positions = {item: position for position, item in enumerate(self._items)}
+        assert len(self._positions) == len(self._items)
+
+    def append(self, item):
+        assert item not in self._positions
+        self._positions[item] = len(self._items)
+        self._items.append(item)
+
+    def remove(self, item):
+        position = self._positions.pop(item)
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._positions[last] = position
+
+    def copy(self):
+        return list(self._items)
+
+    def __getitem__(self, position):
+        return self._items[position]
+
+    def __contains__(self, item):
+        return item in self._positions
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __str__(self):
+        return str(self._items)
+
+    def __repr__(self):
+        return repr(self._items)
+
+
+class RainbowCoverage:
+    # the colours of the subgraph induced by a growing set of vertices, kept as a colour mask:
+    # adding a vertex costs O(deg(v)) and the number of distinct colours is one bit_count()
+    def __init__(self, graph, vertices: Iterable[Vertex] = ()):
+        self.graph = graph
+        self.vertices = set()
+        self.mask = 0
+        self.update(vertices)
+
+    def add(self, vertex: Vertex):
+        if vertex in self.vertices:
+            return
+        self.mask |= self.graph.vertex_colour_mask_into_sub_graph(vertex, self.vertices)
+        self.vertices.add(vertex)
+
+    def update(self, vertices: Iterable[Vertex]):
+        for vertex in vertices:
+            self.add(vertex)
+
+    @property
+    def colours(self):
+        return set(mask_colours(self.mask))
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+
+class ColourDegreeSelector:
+    # Picks the candidate with the largest colour degree into the subgraph `sub_vertices`, as
+    # Graph.max_colour_degree_into_subgraph does, while colours are removed between picks. Each
+    # candidate is listed under the colours of its edges into the subgraph, and candidates sit in buckets
+    # by colour degree; a bucket is a heap of candidate positions, so ties go to the first candidate.
+    def __init__(self, graph, sub_vertices: Iterable[Vertex], from_vertices: Iterable[Vertex] = None):
+        if not from_vertices:
+            from_vertices = graph.vertices.values()
+        self.candidates = list(from_vertices)
+        members = set(sub_vertices)
+        self.degrees = []
+        # colour -> positions of the candidates with an edge of that colour into the subgraph
+        self.holders = defaultdict(set)
+        for position, vertex in enumerate(self.candidates):
+            mask = graph.vertex_colour_mask_into_sub_graph(vertex, members)
+            for colour in mask_colours(mask):
+                self.holders[colour].add(position)
+            self.degrees.append(mask.bit_count())
+        self.top = max(self.degrees, default=0)
+        self.buckets = [[] for _ in range(self.top + 1)]
+        for position, degree in enumerate(self.degrees):
+            self.buckets[degree].append(position)
+
+    def argmax(self):
+        while True:
+            bucket = self.buckets[self.top]
+            # entries left behind when a candidate moved to a lower bucket are dropped here
+            while bucket and self.degrees[bucket[0]] != self.top:
+                heapq.heappop(bucket)
+            if bucket or self.top == 0:
+                return self.candidates[bucket[0]]
+            self.top -= 1
+
+    def remove_colours(self, colours: Iterable):
+        for colour in colours:
+            for position in self.holders.pop(colour, ()):
+                self.degrees[position] -= 1
+                heapq.heappush(self.buckets[self.degrees[position]], position)
+
+
+class AdjacencyMatrix:
+    # A snapshot of which vertices of a graph are adjacent, for dense graphs: the row of vertex i is an int
+    # with bit j set when i and j are adjacent, so the matrix takes n*n bits and neighbourhoods can be
+    # combined with | and &. Changes to the graph after it is built are not reflected.
+    def __init__(self, vertex_indices: Iterable[int], edges):
+        self.rows = dict.fromkeys(vertex_indices, 0)
+        for i, j in edges:
+            self.rows[i] |= 1 << j
+            self.rows[j] |= 1 << i
+
+    def adjacent(self, u, v):
+        return self.rows[u.index] >> v.index & 1 == 1
+
+    def neighbour_mask(self, vertex):
+        return self.rows[vertex.index]
+
+    def neighbour_indices(self, vertex):
+        return mask_bits(self.rows[vertex.index])
+
+
 class Graph:
 
     # create an empty graph
@@ -111,60 +369,97 @@ class Graph:
         self.name = name
         self._vertex_index = 0
         self.vertices: Dict[int][Vertex] = dict()
-        self.edges: List[Edge] = []
+        # edge id -> Edge, with None for removed edges
+        self._edge_table: List[Edge] = []
+        self.edges: IndexedSet = IndexedSet()
         self.colours = defaultdict(set)
-        self.degrees = defaultdict(list)
+        self.degrees = defaultdict(IndexedSet)
         self.maxColour = maxColour
 
     @property
     def num_colours(self):
         return len(self.colours.keys())
 
+    def edge_by_id(self, id):
+        return self._edge_table[id]
+
+    @property
+    def colour_mask(self):
+        return colour_mask(self.colours.keys())
+
+    # per-vertex queries go through these, so that a GraphView can hide the edges it has removed
+    def vertex_colours(self, vertex: Vertex):
+        return vertex.colours
+
+    def vertex_colour_degree(self, vertex: Vertex):
+        return vertex.colour_degree
+
+    def vertex_colour_mask(self, vertex: Vertex):
+        return vertex.colour_mask
+
+    def vertex_neighbours(self, vertex: Vertex):
+        return vertex.neighbours
+
+    def vertex_colours_into_sub_graph(self, vertex: Vertex, vertices):
+        return vertex.colours_into_sub_graph(vertices)
+
+    def vertex_colour_mask_into_sub_graph(self, vertex: Vertex, vertices):
+        return vertex.colour_mask_into_sub_graph(vertices)
+
+    def vertex_edges_into_sub_graph(self, vertex: Vertex, vertices):
+        return vertex.edges_into_sub_graph(vertices)
+
     def max_colour_degree(self):
-        vertex = max(self.vertices.values(), key=lambda v: v.colour_degree)
+        vertex = max(self.vertices.values(), key=self.vertex_colour_degree)
         return vertex
 
     def max_colour_degree_into_subgraph(self, sub_vertices: List[Vertex], from_vertices: List[Vertex] = None):
-        if from_vertices:
-            vertex = max(from_vertices, key=lambda v: v.colour_degree_into_sub_graph(sub_vertices))
-        else:
-            vertex = max(self.vertices.values(), key=lambda v: v.colour_degree_into_sub_graph(sub_vertices))
+        if not from_vertices:
+            from_vertices = self.vertices.values()
+        vertex = max(from_vertices, key=lambda v: self.vertex_colour_mask_into_sub_graph(v, sub_vertices).bit_count())
         return vertex
 
+    # a ColourDegreeSelector for repeated max_colour_degree_into_subgraph calls with colours removed in between
+    def colour_degree_selector(self, sub_vertices: Iterable[Vertex], from_vertices: Iterable[Vertex] = None):
+        return ColourDegreeSelector(self, sub_vertices, from_vertices)
+
     def keep_only_one_edge_of_each_colour(self, vertex: Vertex):
         remove_edges = set()
         keep_edges = set()
-        for colour in vertex.colours.keys():
-            keep = vertex.colours[colour].pop()
+        for edges in self.vertex_colours(vertex).values():
+            keep = first_edge(edges)
             keep_edges.add(keep)
-            remove_edges = remove_edges.union(vertex.colours[colour])
-            vertex.colours[colour].add(keep)
+            remove_edges.update(edge for edge in edges if edge is not keep)
 
         for edge in keep_edges:
             if edge.v1 == vertex:
                 neigh = edge.v2
             else:
                 neigh = edge.v1
-            for rem_edge in neigh.colours[edge.colour]:
+            for rem_edge in self.vertex_colours(neigh)[edge.colour]:
                 if rem_edge != edge:
                     remove_edges.add(rem_edge)
 
         for edge in remove_edges:
             self.removeEdge(edge)
 
+    # returns the colours that were removed
     def remove_all_colours_incident_to_vertex(self, vertex: Vertex):
-        edges = set(vertex.incidentEdges)
-        for colour in vertex.colours.keys():
-            edges = edges.union(self.colours[colour])
+        colours = set(vertex.colours.keys())
+        edges = set()
+        for colour in colours:
+            edges.update(self.colours[colour])
 
         for edge in edges:
             self.removeEdge(edge)
+        return colours
 
     def distinct_colours_of_subgraph(self, sub_vertices: Iterable[Vertex]):
-        colours = set()
-        for vertex in sub_vertices:
-            colours = colours.union(vertex.colours_into_sub_graph(sub_vertices))
-        return colours
+        return self.coverage(sub_vertices).colours
+
+    # a RainbowCoverage of the subgraph induced by `sub_vertices`, which can be grown afterwards
+    def coverage(self, sub_vertices: Iterable[Vertex] = ()):
+        return RainbowCoverage(self, sub_vertices)
 
     def vertices_by_index(self, indices: Iterable[int]):
         vertices = []
@@ -173,7 +468,7 @@ class Graph:
         return vertices
 
     def remove_all_colours_in_sub_graph(self, sub_vertices: Iterable[Vertex]):
-        colours = self.distinct_colours_of_subgraph(sub_vertices)
+        colours = mask_colours(self.coverage(sub_vertices).mask)
         remove_edges = []
         for c in colours:
             remove_edges.extend(self.colours[c])
@@ -182,20 +477,41 @@ class Graph:
             self.removeEdge(edge)
 
     def induced_sub_graph(self, sub_vertices):
-        sub_graph = self.__class__(name=f"{self.name}-sub")
+        sub_vertices = list(sub_vertices)
         edges = set()
         for vertex in sub_vertices:
-            sub_graph.newVertex(vertex.index)
-            for edge in vertex.edges_into_sub_graph(sub_vertices):
+            for edge in self.vertex_edges_into_sub_graph(vertex, sub_vertices):
                 edges.add((edge.v1.index, edge.v2.index, edge.colour))
 
-        for e in edges:
-            v1 = sub_graph.vertices[e[0]]
-            v2 = sub_graph.vertices[e[1]]
-            c = e[2]
-            sub_graph.addEdge(v1, v2, c)
-
-        return sub_graph
+        return Graph.from_edges([vertex.index for vertex in sub_vertices], edges, name=f"{self.name}-sub")
+
+    # for every pair of colours that meet at a vertex, a path (v1, v2, v3) whose two edges have those
+    # colours, as {c1: {c2: {v1, v2, v3}}}; one pass over the colours at each vertex finds all of them
+    def colour_adjacency(self):
+        adjacency = defaultdict(dict)
+        for vertex in self.vertices.values():
+            vertex_colours = list(self.vertex_colours(vertex).items())
+            for i, (c1, edges1) in enumerate(vertex_colours):
+                for c2, edges2 in vertex_colours[:i]:
+                    if c2 in adjacency[c1]:
+                        continue
+                    path = self._path_through(vertex, edges1, edges2)
+                    if path:
+                        adjacency[c1][c2] = path
+                        adjacency[c2][c1] = path
+        return adjacency
+
+    # a path through `vertex` using one edge of `edges1` and one of `edges2`, or None
+    # if they all lead to the same neighbour
+    @staticmethod
+    def _path_through(vertex, edges1, edges2):
+        for e1 in edges1:
+            a = e1.v2 if e1.v1 == vertex else e1.v1
+            for e2 in edges2:
+                b = e2.v2 if e2.v1 == vertex else e2.v1
+                if a != b:
+                    return {vertex, a, b}
+        return None
 
     def find_adjacent_vertices_with_colours(self, c1, c2):
         for e1 in self.colours[c1]:
@@ -226,24 +542,27 @@ class Graph:
             index = self.vertex_index
         if index in self.vertices.keys():
             raise ValueError(f"Index {index} already exists in the graph")
-        v = Vertex(index)
+        v = Vertex(index, self._edge_table)
         self.vertices[v.index] = v
         self.degrees[0].append(v)
         return v
 
-    # connect vertices u and v with an edge of a specified colour
+    # connect vertices u and v with an edge of a specified colour; returns the new edge, or None for a self edge
     def addEdge(self, u: Vertex, v: Vertex, colour):
         assert self.vertices[v.index] is v and self.vertices[u.index] is u
         if(u is not v):
             self.degrees[v.degree()].remove(v)
             self.degrees[u.degree()].remove(u)
-            newEdge = Edge(u, v, colour)
+            newEdge = Edge(u, v, colour, len(self._edge_table))
+            self._edge_table.append(newEdge)
             self.edges.append(newEdge)
             u.addEdge(newEdge)
             v.addEdge(newEdge)
             self.colours[colour].add(newEdge)
             self.degrees[v.degree()].append(v)
             self.degrees[u.degree()].append(u)
+            return newEdge
+        return None
 
     def removeEdge(self, edge: Edge):
         assert edge is not None
@@ -255,15 +574,22 @@ class Graph:
         self.colours[edge.colour].remove(edge)
         if len(self.colours[edge.colour]) == 0:
             del self.colours[edge.colour]
+        self._edge_table[edge.id] = None
         self.degrees[edge.v1.degree()].append(edge.v1)
         self.degrees[edge.v2.degree()].append(edge.v2)
 
     # check if vertices u and v are connected by at least one edge
     def adjacent(self, u: Vertex, v: Vertex):
         assert self.vertices[v.index] is v and self.vertices[u.index] is u
-        return u in v.neighbours
+        return u in v._neighbours
 
+    # an AdjacencyMatrix of the graph as it is now
+    def adjacency_matrix(self):
+        return AdjacencyMatrix(self.vertices.keys(), ((edge.v1.index, edge.v2.index) for edge in self.edges))
+
+    # networkx and matplotlib are only imported here, so that nothing else pays for loading them
     def toNX(self):
+        import networkx as nx
         nx_graph = nx.MultiGraph()
 
         for e in self.edges:
@@ -272,101 +598,287 @@ class Graph:
         return nx_graph
 
     def draw(self):
+        import networkx as nx
+        from matplotlib import pyplot as plt
         selfNX = self.toNX()
         selfcolors = list(nx.get_edge_attributes(selfNX, name='color').values())
         nx.draw(selfNX, edge_color=selfcolors)
         plt.show()
 
+    # build a graph from (v1, v2, colour) triples; `vertices` is the vertex indices, or n for 0..n-1.
+    # The edge list and degree buckets are filled once at the end instead of being updated per edge.
     @classmethod
-    def from_adjacency_matrix(cls, adjacency_matrix):
-        graph = cls()
+    def from_edges(cls, vertices, edges, maxColour=None, name=None):
+        graph = cls(maxColour, name=name)
+        if isinstance(vertices, int):
+            vertices = range(vertices)
+        for index in vertices:
+            if index in graph.vertices:
+                raise ValueError(f"Index {index} already exists in the graph")
+            graph.vertices[index] = Vertex(index, graph._edge_table)
+
+        newEdges = graph._edge_table
+        for v1, v2, colour in edges:
+            u = graph.vertices[v1]
+            v = graph.vertices[v2]
+            if u is not v:
+                newEdge = Edge(u, v, colour, len(newEdges))
+                newEdges.append(newEdge)
+                u.addEdge(newEdge)
+                v.addEdge(newEdge)
+                graph.colours[colour].add(newEdge)
+
+        graph.edges = IndexedSet(newEdges)
+        for vertex in graph.vertices.values():
+            graph.degrees[vertex.degree()].append(vertex)
+        return graph
 
+    @classmethod
+    def from_adjacency_matrix(cls, adjacency_matrix):
         n = len(adjacency_matrix)
-        for i in range(n):
-            graph.newVertex(i)
-        for i in range(n):
-            for j in range(n):
-                if adjacency_matrix[i][j] != 0:
-                    color = adjacency_matrix[i][j]
-                    graph.addEdge(graph.vertices[i], graph.vertices[j], color)
-        return graph
+        edges = [(i, j, adjacency_matrix[i][j]) for i in range(n) for j in range(n) if adjacency_matrix[i][j] != 0]
+        return cls.from_edges(n, edges)
+
+    # a GraphView that starts out equal to this graph, without copying anything
+    def view(self):
+        return GraphView(self)
+
+    def copy(self):
+        edges = [(edge.v1.index, edge.v2.index, edge.colour) for edge in self.edges]
+        return Graph.from_edges(self.vertices.keys(), edges, self.maxColour, name=self.name)
+
+
+class _AliveColours(Mapping):
+    # the colours -> edges map of a GraphView, leaving out removed edges and empty colours
+
+    def __init__(self, view):
+        self.view = view
+
+    def __getitem__(self, colour):
+        if not self.view.colour_alive(colour):
+            raise KeyError(colour)
+        return {edge for edge in self.view.base.colours[colour] if edge.id not in self.view.removed_edges}
+
+    def __iter__(self):
+        return (colour for colour in self.view.base.colours.keys() if self.view.colour_alive(colour))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class GraphView(Graph):
+    # A graph that shares the vertices and edges of `base` and records only which edges and colours
+    # have been removed (the edges by id, the colours as a colour mask), so creating one and removing
+    # an edge are O(1).
+    # The base graph must not change while views of it are in use.
+    def __init__(self, base: Graph, removed_edges=None, removed_colour_mask=0, removed_per_colour=None):
+        self.base = base
+        self.name = base.name
+        self.maxColour = base.maxColour
+        self.vertices = base.vertices
+        self._edge_table = base._edge_table
+        self.removed_edges = set() if removed_edges is None else removed_edges
+        self.removed_colour_mask = removed_colour_mask
+        # the number of removed edges of each colour that has not been removed as a whole
+        self.removed_per_colour = defaultdict(int) if removed_per_colour is None else removed_per_colour
+        self.colours = _AliveColours(self)
+
+    @property
+    def removed_colours(self):
+        return set(mask_colours(self.removed_colour_mask))
+
+    def alive(self, edge: Edge):
+        return not self.removed_colour_mask >> edge.colour & 1 and edge.id not in self.removed_edges
+
+    def colour_alive(self, colour):
+        return not self.removed_colour_mask >> colour & 1 and \
+            self.removed_per_colour.get(colour, 0) < len(self.base.colours.get(colour, ()))
+
+    @property
+    def edges(self):
+        return [edge for edge in self.base.edges if self.alive(edge)]
+
+    def m(self):
+        return len(self.edges)
+
+    def vertex_colours(self, vertex: Vertex):
+        colours = dict()
+        for colour, ids in vertex._colours.items():
+            if self.removed_colour_mask >> colour & 1:
+                continue
+            alive = ids - self.removed_edges
+            if alive:
+                colours[colour] = _EdgeSet(self._edge_table, alive)
+        return colours
+
+    def vertex_colour_degree(self, vertex: Vertex):
+        return self.vertex_colour_mask(vertex).bit_count()
+
+    def vertex_colour_mask(self, vertex: Vertex):
+        mask = vertex.colour_mask & ~self.removed_colour_mask
+        # only colours with removed edges can have lost all their edges at this vertex
+        if self.removed_per_colour:
+            for colour, ids in vertex._colours.items():
+                if mask >> colour & 1 and colour in self.removed_per_colour and ids <= self.removed_edges:
+                    mask &= ~(1 << colour)
+        return mask
+
+    def alive_id(self, id):
+        return id not in self.removed_edges and not self.removed_colour_mask >> self._edge_table[id].colour & 1
+
+    def vertex_neighbours(self, vertex: Vertex):
+        # the neighbours in the order of the base graph either way, as a keys view, so that the result does not
+        # depend on the addresses of the vertices
+        if not self.removed_edges and not self.removed_colour_mask:
+            return vertex.neighbours
+        return {neighbour: None for neighbour, ids in vertex._neighbours.items() if any(self.alive_id(i) for i in ids)}.keys()
+
+    def adjacent(self, u: Vertex, v: Vertex):
+        assert self.vertices[v.index] is v and self.vertices[u.index] is u
+        return any(self.alive_id(i) for i in v._neighbours.get(u, ()))
+
+    def vertex_colours_into_sub_graph(self, vertex: Vertex, vertices):
+        table = self._edge_table
+        return {table[i].colour for i in vertex.edge_ids_into_sub_graph(vertices) if self.alive_id(i)}
+
+    def vertex_colour_mask_into_sub_graph(self, vertex: Vertex, vertices):
+        table = self._edge_table
+        mask = 0
+        # colours that are removed or already found need no check of their edges
+        skip = self.removed_colour_mask
+        for i in vertex.edge_ids_into_sub_graph(vertices):
+            bit = 1 << table[i].colour
+            if not skip & bit and i not in self.removed_edges:
+                mask |= bit
+                skip |= bit
+        return mask
+
+    def vertex_edges_into_sub_graph(self, vertex: Vertex, vertices):
+        table = self._edge_table
+        return [table[i] for i in vertex.edge_ids_into_sub_graph(vertices) if self.alive_id(i)]
+
+    def removeEdge(self, edge: Edge):
+        assert self.alive(edge)
+        self.removed_edges.add(edge.id)
+        self.removed_per_colour[edge.colour] += 1
+
+    def remove_all_colours_incident_to_vertex(self, vertex: Vertex):
+        mask = self.vertex_colour_mask(vertex)
+        self.removed_colour_mask |= mask
+        return set(mask_colours(mask))
+
+    def remove_all_colours_in_sub_graph(self, sub_vertices: Iterable[Vertex]):
+        self.removed_colour_mask |= self.coverage(sub_vertices).mask
+
+    def newVertex(self, index=None):
+        raise TypeError("vertices cannot be added to a GraphView")
+
+    def addEdge(self, u: Vertex, v: Vertex, colour):
+        raise TypeError("edges cannot be added to a GraphView")
+
+    # an independent view with the same removals; it costs O(number of removed edges and colours)
+    def view(self):
+        return GraphView(self.base, set(self.removed_edges), self.removed_colour_mask,
+                         defaultdict(int, self.removed_per_colour))
 
     def copy(self):
-        newGraph = Graph()
-        for index in self.vertices.keys():
-            newGraph.newVertex(index)
-
-        for edge in self.edges:
-            v1 = newGraph.vertices[edge.v1.index]
-            v2 = newGraph.vertices[edge.v2.index]
-            newGraph.addEdge(v1, v2, edge.colour)
-
-        return newGraph
-
-
-def rewire(G):
-    m = G.m()
-
-    # find the first edge
-    edgeNum = random.randint(0, m - 1)
-    edge = G.edges[edgeNum]
-
-    # find the first two vertices
-    vertexNum = random.randint(0, 1)
-    if vertexNum == 0:
-        u1 = edge.v1
-        v = edge.v2
-    else:
-        u1 = edge.v2
-        v = edge.v1
-
-    vertexDegree = u1.degree()
-    u2 = None
-    w = None
-    otherEdge = None
-
-    #find all the eligible edges
-    eligibleEdges = []
-    for vertex in G.degrees[vertexDegree]:
-        for potentialEdge in vertex.incidentEdges:
-            if not potentialEdge in eligibleEdges and potentialEdge is not edge:
-                eligibleEdges.append(potentialEdge)
-
-    #if there is an eligible edge, pick one
-    if len(eligibleEdges) > 0:
-        otherEdge = eligibleEdges[random.randint(0, len(eligibleEdges)-1)]
-    
-        if otherEdge.v1.degree() == vertexDegree:
-            u2 = otherEdge.v1
-            w = otherEdge.v2
+        return self.view()
+
+
+class Rewirer:
+    # Degree-preserving edge swaps on `graph`, the same swaps rewire() has always made, with O(1)
+    # sampling. Each vertex keeps the ids of its incident edges in an IndexedSet and graph.degrees holds
+    # the vertices of each degree, so an edge incident to a vertex of a given degree is drawn by picking
+    # a vertex from the bucket and then one of its edges. All randomness comes from `rng`, which may
+    # be a seed or a random.Random; with the same seed and input graph the swaps are the same.
+    def __init__(self, graph, rng=None):
+        self.graph = graph
+        self.rng = rng if isinstance(rng, random.Random) else random.Random(rng)
+        # built from the edge list rather than the incidentEdges sets, so the order is reproducible
+        self.incident = {vertex: IndexedSet() for vertex in graph.vertices.values()}
+        for edge in graph.edges:
+            self.incident[edge.v1].append(edge.id)
+            self.incident[edge.v2].append(edge.id)
+
+    # an edge other than `edge` incident to a vertex of degree `degree`, uniformly at random, or None
+    def eligible_edge(self, edge, degree):
+        bucket = self.graph.degrees[degree]
+        ends = (edge.v1.degree() == degree) + (edge.v2.degree() == degree)
+        if degree * len(bucket) == ends:
+            return None
+        while True:
+            vertex = bucket[self.rng.randrange(len(bucket))]
+            candidate = self.graph.edge_by_id(self.incident[vertex][self.rng.randrange(degree)])
+            if candidate is edge:
+                continue
+            # an edge with both ends of this degree can be drawn from either end, so keep it half the time
+            if candidate.v1.degree() == degree and candidate.v2.degree() == degree and self.rng.random() < 0.5:
+                continue
+            return candidate
+
+    def swap(self):
+        G = self.graph
+        rng = self.rng
+
+        # find the first edge
+        edge = G.edges[rng.randrange(G.m())]
+
+        # find the first two vertices
+        if rng.randrange(2) == 0:
+            u1 = edge.v1
+            v = edge.v2
         else:
-            u2 = otherEdge.v2
-            w = otherEdge.v1
-    
-    #otherwise, choose an edge uniformly at random
-    else:
-        otherEdge = edge
-        while otherEdge is edge:
-            otherEdge = G.edges[random.randint(0, len(G.edges)-1)]
-
-        if otherEdge.v1 is u1:
-            u2 = otherEdge.v2
-            w = otherEdge.v1
+            u1 = edge.v2
+            v = edge.v1
+
+        vertexDegree = u1.degree()
+
+        #if there is an eligible edge, pick one
+        otherEdge = self.eligible_edge(edge, vertexDegree)
+        if otherEdge is not None:
+            if otherEdge.v1.degree() == vertexDegree:
+                u2 = otherEdge.v1
+                w = otherEdge.v2
+            else:
+                u2 = otherEdge.v2
+                w = otherEdge.v1
+
+        #otherwise, choose an edge uniformly at random
         else:
-            u2 = otherEdge.v1
-            w = otherEdge.v2
+            otherEdge = edge
+            while otherEdge is edge:
+                otherEdge = G.edges[rng.randrange(G.m())]
+
+            if otherEdge.v1 is u1:
+                u2 = otherEdge.v2
+                w = otherEdge.v1
+            else:
+                u2 = otherEdge.v1
+                w = otherEdge.v2
+
+        for oldEdge in (edge, otherEdge):
+            G.removeEdge(oldEdge)
+            self.incident[oldEdge.v1].remove(oldEdge.id)
+            self.incident[oldEdge.v2].remove(oldEdge.id)
+
+        for newEdge in (G.addEdge(u1, w, edge.colour), G.addEdge(u2, v, otherEdge.colour)):
+            if newEdge is not None:
+                self.incident[newEdge.v1].append(newEdge.id)
+                self.incident[newEdge.v2].append(newEdge.id)
+
+    def rewire(self, swaps):
+        for _ in range(swaps):
+            self.swap()
 
-    G.removeEdge(edge)
-    G.removeEdge(otherEdge)
 
-    G.addEdge(u1, w, edge.colour)
-    G.addEdge(u2, v, otherEdge.colour)
+# a single swap; use a Rewirer directly to make many, as it indexes the graph once
+def rewire(G, rng=None):
+    Rewirer(G, rng).swap()
 
 
-def randomGraph(G):
+def randomGraph(G, rng=None):
     k = G.m()
     newGraph = G.copy()
 
-    for _ in range(k):
-        rewire(newGraph)
-    return newGraph
\ No newline at end of file
+    Rewirer(newGraph, rng).rewire(k)
+    return newGraph
@@ -1,46 +1,37 @@
+import heapq
+
 import Graph
 
-def computeValues(inputGraph, coloursNeeded):
-    n = inputGraph.n()
-    value = [0] * n
+def newEdgesOf(vertex, coloursNeeded):
+    # the first incident edge of each colour that is still needed
     newEdges = []
-    for i in range(n):
-        newEdges.append([])
-
-    for i in range(n):
-        vertex = inputGraph.vertices[i]
-        incidentColours = []
-        for edge in vertex.incidentEdges:
-            if edge.colour in coloursNeeded and not edge.colour in incidentColours:
-                value[i]+=1
-                newEdges[i].append(edge)
-                incidentColours.append(edge.colour)
-    return value, newEdges
+    incidentColours = set()
+    for edge in vertex.incidentEdges:
+        if edge.colour in coloursNeeded and not edge.colour in incidentColours:
+            newEdges.append(edge)
+            incidentColours.add(edge.colour)
+    return newEdges
 
 def Koch2011(inputGraph):
     n = inputGraph.n()
     H = Graph.Graph(inputGraph.maxColour)
-    coloursNeeded = []
+    coloursNeeded = set(inputGraph.colours.keys())
 
-    for edge in inputGraph.edges:
-        if not edge.colour in coloursNeeded:
-            coloursNeeded.append(edge.colour)
+    # the value of a vertex is the number of needed colours it is incident to; the values only
+    # ever go down, so keep them in a lazy max-heap and skip entries that have gone stale
+    value = [inputGraph.vertices[i].colour_degree for i in range(n)]
+    heap = [(-value[i], i) for i in range(n)]
+    heapq.heapify(heap)
 
     while len(coloursNeeded) > 0:
-        #find the value of each vertex
-        value, incidentEdges = computeValues(inputGraph, coloursNeeded)
-
-        #find the vertex of the maximum value
-        maxValue = -1
-        maxI = -1
-        for i in range(n):
-            if value[i] > maxValue:
-                maxValue = value[i]
-                maxI = i
+        #find the vertex of the maximum value, ties go to the lowest index
+        negValue, maxI = heapq.heappop(heap)
+        while -negValue != value[maxI]:
+            negValue, maxI = heapq.heappop(heap)
 
         #add the vertex and all the new edges to the output graph
         newVertex = inputGraph.vertices[maxI]
-        newEdges = incidentEdges[maxI]
+        newEdges = newEdgesOf(newVertex, coloursNeeded)
 
         for edge in newEdges:
             assert(newVertex == edge.v1 or newVertex == edge.v2)
@@ -51,8 +42,19 @@ def Koch2011(inputGraph):
             if not i2 in H.vertices.keys():
                 H.newVertex(i2)
             H.addEdge(H.vertices[i1], H.vertices[i2], edge.colour)
-            
-            if edge.colour in coloursNeeded:
-                coloursNeeded.remove(edge.colour) #we no longer need this colour
 
-    return H
\ No newline at end of file
+            coloursNeeded.remove(edge.colour) #we no longer need this colour
+
+            #only the vertices on an edge of this colour lose value
+            touched = set()
+            for colourEdge in inputGraph.colours[edge.colour]:
+                touched.add(colourEdge.v1.index)
+                touched.add(colourEdge.v2.index)
+            for i in touched:
+                value[i] -= 1
+                heapq.heappush(heap, (-value[i], i))
+
+    return H
+
+
+Koch2011.version = 1
@@ -1,172 +1,303 @@
 import Graph as G
+import instrumentation
+from CompactGraph import CompactGraph
 import math as m
+import numpy as np
 import random
 import os
-import multiprocessing
-import threading
+import gc
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from statistics import mean
 from Koch2011 import Koch2011
 from tirodkar import Tirodkar2017
 from camacho2010 import Camacho2010
+from exact_mrs import ExactMRS
+from result_cache import ResultCache, fingerprint
 import sys
 
 def writeGraphToFile(graph : G.Graph, fileName):
     # write each edge
+    v1, v2, colour = edgeArrays(graph)
     file = open(fileName, "a")
-    for edge in graph.edges:
-        file.write(str(edge.v1.index) + "," + str(edge.v2.index) + "," + str(edge.colour) + "\n")
+    file.write("".join(f"{a},{b},{c}\n" for a, b, c in zip(v1.tolist(), v2.tolist(), colour.tolist())))
     file.write("#") # between the graphs
     file.close()
 
-def generateTestData(startGraph, numGraphs, fileName):
+def generateTestData(startGraph, numGraphs, fileName, seed=None):
     graph = startGraph
+    rng = random.Random(seed)
 
     # generate a sequence of random graphs
     for _ in range(numGraphs):
-        graph = G.randomGraph(graph)
+        graph = G.randomGraph(graph, rng)
         writeGraphToFile(graph, fileName)
 
-def readTestData(fileName):
-    # open the file containing the test data
+def readTestRecords(fileName, chunkSize=1 << 20):
+    # yield the '#'-separated records of a test data file one at a time, reading the file in chunks
     file = open(fileName, "r")
-    testDataString = file.read()
-    file.close()
+    try:
+        parts = []
+        while True:
+            chunk = file.read(chunkSize)
+            if len(chunk) == 0:
+                break
+            pieces = chunk.split("#")
+            for piece in pieces[:-1]:
+                parts.append(piece)
+                yield "".join(parts)
+                parts = []
+            parts.append(pieces[-1])
+        yield "".join(parts)
+    finally:
+        file.close()
 
-    graphs = []
+def parseEdges(record):
+    # the edges of one record as an (m, 3) array of (v1, v2, colour)
+    return np.fromstring(record.strip().replace("\n", ","), dtype=np.int64, sep=",").reshape(-1, 3)
 
-    #split the string into the strings for each test
-    testDataStrings = testDataString.split("#")
-    params = testDataStrings[0].split(",")
+def streamTestData(fileName, compact=False):
+    # like readTestData, but the graphs are built lazily, one record at a time
+    records = readTestRecords(fileName)
+    params = next(records).split(",")
     size = int(params[0])
     density = int(params[1])
     maxColour = int(params[2])
 
-    # parse the string for each test into a graph object
-    for i in range(1, len(testDataStrings)):
-        testString = testDataStrings[i]
-
-        if len(testString) > 0:
-            graphData = testString.split("\n")
+    def graphs():
+        for record in records:
+            if len(record) > 0:
+                edges = parseEdges(record)
+                if compact:
+                    yield CompactGraph.from_edges(size, edges, maxColour)
+                else:
+                    yield G.Graph.from_edges(size, edges.tolist(), maxColour)
+
+    return [graphs(), size, density, maxColour]
+
+def readTestData(fileName, compact=False):
+    testData = streamTestData(fileName, compact=compact)
+    testData[0] = list(testData[0])
+    return testData
+
+# Binary data sets hold the same graphs as the text files, as little-endian int32 words:
+#   header:     magic "MRSG", format version, size, density, maxColour, 0
+#   each graph: m as an int64 (two words), then the columns v1[m], v2[m] and colour[m],
+#               and one padding word when m is odd, so every graph starts on an 8-byte boundary
+BINARY_MAGIC = b"MRSG"
+BINARY_VERSION = 1
+
+def edgeArrays(graph):
+    # the (v1, v2, colour) columns of a graph, in edge order
+    if isinstance(graph, CompactGraph):
+        return graph.v1, graph.v2, graph.colour
+    edges = np.array([(edge.v1.index, edge.v2.index, edge.colour) for edge in graph.edges], dtype="<i4").reshape(-1, 3)
+    return edges[:, 0], edges[:, 1], edges[:, 2]
+
+def writeBinaryHeader(fileName, size, density, maxColour):
+    file = open(fileName, "wb")
+    file.write(BINARY_MAGIC)
+    file.write(np.array([BINARY_VERSION, size, density, maxColour, 0], dtype="<i4").tobytes())
+    file.close()
 
-            newGraph = G.Graph(maxColour)
-            # create the vertices
-            for i in range(size):
-                newGraph.newVertex(i)
+def writeGraphToBinaryFile(graph, fileName):
+    v1, v2, colour = edgeArrays(graph)
+    m = len(colour)
+    file = open(fileName, "ab")
+    file.write(np.array([m], dtype="<i8").tobytes())
+    for column in (v1, v2, colour):
+        file.write(np.ascontiguousarray(column, dtype="<i4").tobytes())
+    if m % 2 == 1:
+        file.write(np.zeros(1, dtype="<i4").tobytes())
+    file.close()
 
-            # create the edges
-            for i in range(0, len(graphData)):
-                edgeStr = graphData[i]
-                if len(edgeStr) > 0:
-                    indices = edgeStr.split(",")
-                    newGraph.addEdge(newGraph.vertices[int(indices[0])], newGraph.vertices[int(indices[1])], int(indices[2]))
+def readBinaryTestData(fileName):
+    # the graphs are CompactGraphs over a memory map of the file, so the edge columns are not copied
+    words = np.memmap(fileName, dtype="<i4", mode="r")
+    if words[:1].tobytes() != BINARY_MAGIC or words[1] != BINARY_VERSION:
+        raise ValueError(f"{fileName} is not a version {BINARY_VERSION} binary test data file")
+    size, density, maxColour = (int(x) for x in words[2:5])
 
-            graphs.append(newGraph)
+    graphs = []
+    position = 6
+    while position < len(words):
+        m = int(words[position:position + 2].view("<i8")[0])
+        position += 2
+        v1 = words[position:position + m]
+        v2 = words[position + m:position + 2 * m]
+        colour = words[position + 2 * m:position + 3 * m]
+        graphs.append(CompactGraph(size, v1, v2, colour, maxColour))
+        position += 3 * m + m % 2
 
     return [graphs, size, density, maxColour]
 
-def runTest(testData, mrsFunction, draw=False):
+def convertTestFile(fileName, binaryFileName=None):
+    # write a text data set as a binary one next to it, and check that both hold the same graphs
+    if binaryFileName is None:
+        binaryFileName = os.path.splitext(fileName)[0] + ".bin"
+    tempFileName = binaryFileName + ".tmp"
+    graphs, size, density, maxColour = streamTestData(fileName, compact=True)
+    writeBinaryHeader(tempFileName, size, density, maxColour)
+    for graph in graphs:
+        writeGraphToBinaryFile(graph, tempFileName)
+
+    textData = streamTestData(fileName, compact=True)
+    binaryData = readBinaryTestData(tempFileName)
+    if textData[1:] != binaryData[1:]:
+        raise ValueError(f"{binaryFileName} has different parameters from {fileName}")
+    textGraphs = list(textData[0])
+    if len(textGraphs) != len(binaryData[0]):
+        raise ValueError(f"{binaryFileName} has a different number of graphs from {fileName}")
+    for textGraph, binaryGraph in zip(textGraphs, binaryData[0]):
+        for textColumn, binaryColumn in zip(edgeArrays(textGraph), edgeArrays(binaryGraph)):
+            if not np.array_equal(textColumn, binaryColumn):
+                raise ValueError(f"{binaryFileName} has different edges from {fileName}")
+    os.replace(tempFileName, binaryFileName)
+    return binaryFileName
+
+def checkParallelTirodkar(fileName, workers=2):
+    # Tirodkar2017 with a pool of workers has to give the same subgraph as the sequential sweep
+    for index, graph in enumerate(streamTestData(fileName)[0]):
+        sequential = set(Tirodkar2017(graph).vertices.keys())
+        parallel = set(Tirodkar2017(graph, workers=workers).vertices.keys())
+        if sequential != parallel:
+            raise ValueError(f"Tirodkar2017 with {workers} workers gives {sorted(parallel)} for graph {index} of {fileName}, "
+                             f"not {sorted(sequential)}")
+
+def convertTests(directory="Tests"):
+    for fileName in sorted(os.listdir(directory)):
+        if fileName.startswith("TEST_") and fileName.endswith(".txt"):
+            convertTestFile(os.path.join(directory, fileName))
+
+#if timings is a list, the measurements of instrumentation.measure for each graph are appended to it
+def runTest(testData, mrsFunction, draw=False, timings=None, traceMemory=False):
     results = []
 
     graphs = testData[0]
     size = testData[1]
     density = testData[2]
     maxColour = testData[3]
+    # no enumerate: it would keep the last graph alive in the tuple it reuses
+    index = 0
     for graph in graphs:
         if(draw):
             print("drawing original graph")
             graph.draw()
-        resultGraph = mrsFunction(graph)
+        if timings is None:
+            resultGraph = mrsFunction(graph)
+        else:
+            resultGraph, stats = instrumentation.measure(mrsFunction, graph, traceMemory)
+            stats["index"] = index
+            timings.append(stats)
 
         if(draw):
             print("drawing rainbow subgraph")
             resultGraph.draw()
         
         results.append(resultGraph.n())
+        # let the graphs go before the next one is read, so only one graph is in memory at a time; vertices and
+        # edges refer to each other, so the graphs are only freed by the cycle collector
+        del graph, resultGraph
+        gc.collect()
+        index += 1
 
     return [results, size, density, maxColour]
 
-def runTestFromFile(testFile, mrsFunction, draw=False):
-    return runTest(readTestData(testFile), mrsFunction, draw=draw)
+def runTestFromFile(testFile, mrsFunction, draw=False, compact=False, timings=None, traceMemory=False):
+    if testFile.endswith(".bin"):
+        return runTest(readBinaryTestData(testFile), mrsFunction, draw=draw, timings=timings, traceMemory=traceMemory)
+    return runTest(streamTestData(testFile, compact=compact), mrsFunction, draw=draw, timings=timings, traceMemory=traceMemory)
 
-def generateStartingGraph(size, density, maxColour):
+def generateStartingGraph(size, density, maxColour, seed=None):
+    rng = np.random.default_rng(seed)
     edgeDensityFraction = density / 100
 
-    # generate the vertices of the graph
-    newGraph = G.Graph(maxColour)
-    for _ in range(size):
-        newGraph.newVertex()
+    # generate the edges: one Bernoulli draw for every pair of vertices in the upper triangle.
+    # The data sets in Tests were made by trying every ordered pair, so each pair of vertices had
+    # two chances to get an edge; keep that edge probability so new data sets match the old ones
+    pairProbability = 1 - (1 - edgeDensityFraction) ** 2
+    v1, v2 = np.triu_indices(size, k=1)
+    isEdge = rng.random(len(v1)) < pairProbability
+    v1 = v1[isEdge]
+    v2 = v2[isEdge]
 
-    # generate the edges
-    for u in newGraph.vertices.values():
-        for v in newGraph.vertices.values():
-            if u is v or v in u.neighbours:  # no self edges or multiple edges
-                continue
-            edgeProbability = random.random()
-            if edgeProbability < edgeDensityFraction:
-                newGraph.addEdge(u, v, 0)
-
-    # generate the colours
-    toBeColoured = newGraph.edges.copy()
-    colourNum = 0
-    while len(toBeColoured) > 0:
-        edgeIndex = random.randint(0, len(toBeColoured)-1)
-        edge = toBeColoured[edgeIndex]
-        edge.colour = colourNum
-        toBeColoured.remove(edge)
-        colourNum = (colourNum + 1) % maxColour
+    # generate the colours: round robin over the edges in a random order
+    numEdges = len(v1)
+    colours = np.empty(numEdges, dtype=np.int64)
+    colours[rng.permutation(numEdges)] = np.arange(numEdges) % maxColour
+
+    # the edges stay in arrays: randomGraph copies the start graph into an ordinary Graph anyway, so the
+    # objects are only built once
+    newGraph = CompactGraph(size, v1.astype(np.int32), v2.astype(np.int32), colours.astype(np.int32), maxColour)
 
     print("start graph with size=" + str(size) + ", density = " + str(density) + ", and num colours = " + str(maxColour) + " generated.")
     return newGraph
 
-def generateTest(size, density, maxColour):
+def generateTest(size, density, maxColour, binary=False, seed=None):
     #write test info to file
-    if not os.path.exists("EXAMPLE_Tests"):
-        os.mkdir("EXAMPLE_Tests")
+    os.makedirs("EXAMPLE_Tests", exist_ok=True)
 
     fileName = "EXAMPLE_Tests/TEST_" + str(size) + "_" + str(density) + "_" + str(maxColour) + ".txt"
+    # the data set is written to a temporary file that replaces fileName once it is complete,
+    # so a TEST_*.txt file is never seen half written
+    tempFileName = fileName + ".tmp"
 
     if not os.path.isfile(fileName):
-        file = open(fileName, "a")
+        file = open(tempFileName, "w")
         file.write(str(size) + "," + str(density) + "," + str(maxColour) + "#\n")
         file.close()
 
-        startGraph = generateStartingGraph(size, density, maxColour)
-        writeGraphToFile(startGraph, fileName)
+        startGraph = generateStartingGraph(size, density, maxColour, seed)
+        writeGraphToFile(startGraph, tempFileName)
         graphsToGenerate = 10
     else:
         graphs = readTestData(fileName)[0]
         graphsToGenerate = 11 - len(graphs)
         startGraph = graphs[len(graphs)-1]
+        shutil.copyfile(fileName, tempFileName)
 
-    generateTestData(startGraph, graphsToGenerate, fileName)
+    generateTestData(startGraph, graphsToGenerate, tempFileName, seed)
+    os.replace(tempFileName, fileName)
+    if binary:
+        convertTestFile(fileName)
     print("Test data with size = " + str(size) + ", density = " + str(density) + ", num colours = " + str(maxColour) + " generated")
 
 sizes = [10, 50, 100, 200, 500, 1000]
-def generateTests(size):
-    #walk through all edge densities
-    densityMin = 10
-
-    if size == 200:
-        densityMin = 60
-    
-    for edgeDensity in range(densityMin, 90, 10):
-        
-        #figure out what the colour parameters will be
-        maxColours = int(m.sqrt(size))
-        if(maxColours < 5):
-            maxColours = 5
-        colourStep = m.ceil((maxColours - 5) / 5)
-        if colourStep < 1:
-            colourStep = 1
-
-        #walk through the numbers of colours
-        for numColours in range(5, maxColours + colourStep, colourStep):
-            thread = threading.Thread(target=generateTest, args=(size, edgeDensity, numColours,))
-            thread.start()
-
-#will run all generated tests on graphs of size sizeMin to sizeMax (inclusive) and write the results to the results csv
-#mrsFunction should be a function that accepts exactly one parameter (the graph) and returns exactly a rainbow subgraph
-def runTests(mrsFunction, outputFile, sizeMin=10, sizeMax=1000):
+#generates the data sets for each of the given graph sizes on a pool of workers processes (workers=None uses every core)
+#and only returns once all of them are written
+def generateTests(*testSizes, workers=None):
+    tests = []
+    for size in testSizes:
+        #walk through all edge densities
+        densityMin = 10
+
+        if size == 200:
+            densityMin = 60
+
+        for edgeDensity in range(densityMin, 90, 10):
+
+            #figure out what the colour parameters will be
+            maxColours = int(m.sqrt(size))
+            if(maxColours < 5):
+                maxColours = 5
+            colourStep = m.ceil((maxColours - 5) / 5)
+            if colourStep < 1:
+                colourStep = 1
+
+            #walk through the numbers of colours
+            for numColours in range(5, maxColours + colourStep, colourStep):
+                tests.append((size, edgeDensity, numColours))
+
+    # the largest data sets take longest, so they are started first
+    tests.sort(key=lambda test: test[0], reverse=True)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(generateTest, *test) for test in tests]
+        # result() re-raises an exception from generateTest
+        for future in futures:
+            future.result()
+
+def testFileNames(sizeMin=10, sizeMax=1000, directory="EXAMPLE_Tests"):
+    # the data set files of graphs of size sizeMin to sizeMax (inclusive) that exist, in order
     for size in sizes:
         if size >= sizeMin and size <= sizeMax:
             for edgeDensity in range(10,90,10):
@@ -180,21 +311,267 @@ def runTests(mrsFunction, outputFile, sizeMin=10, sizeMax=1000):
 
                 #walk through the numbers of colours
                 for numColours in range(5, maxColours + colourStep, colourStep):
-                    fileName = "./EXAMPLE_Tests/TEST_" + str(size) + "_" + str(edgeDensity) + "_" + str(numColours) + ".txt"
+                    fileName = directory + "/TEST_" + str(size) + "_" + str(edgeDensity) + "_" + str(numColours) + ".txt"
                     if os.path.isfile(fileName):
-                        results = runTestFromFile(fileName, mrsFunction)
-                        resultString = mrsFunction.__name__
-                        resultString += "," + str(results[1])
-                        resultString += "," + str(results[2])
-                        resultString += "," + str(results[3])
-                        for val in results[0]:
-                            resultString += "," + str(val)
-                        resultString += "\n"
-                        resultFile = open(outputFile, "a")
-                        resultFile.write(resultString)
-                        resultFile.close()
-
-def produceAnalysis(fileNames):
+                        yield fileName
+
+def readTestParameters(fileName):
+    # [number of graphs, size, density, maxColour] of a data set file
+    if fileName.endswith(".bin"):
+        testData = readBinaryTestData(fileName)
+        return [len(testData[0])] + testData[1:]
+    records = readTestRecords(fileName)
+    params = [int(param) for param in next(records).split(",")]
+    return [sum(1 for record in records if len(record) > 0)] + params
+
+def readTestGraph(fileName, index):
+    # only the index-th graph of a data set file is built
+    if fileName.endswith(".bin"):
+        return readBinaryTestData(fileName)[0][index]
+    records = readTestRecords(fileName)
+    size, density, maxColour = (int(param) for param in next(records).split(","))
+    for record in records:
+        if len(record) > 0:
+            if index == 0:
+                return G.Graph.from_edges(size, parseEdges(record).tolist(), maxColour)
+            index -= 1
+    raise IndexError(f"{fileName} has no graph {index}")
+
+def readTestFingerprints(fileName):
+    # the result_cache fingerprint of every graph of a data set file, without building the graphs
+    if fileName.endswith(".bin"):
+        graphs, size, density, maxColour = readBinaryTestData(fileName)
+        return [fingerprint(size, *edgeArrays(graph)) for graph in graphs]
+    records = readTestRecords(fileName)
+    size = int(next(records).split(",")[0])
+    fingerprints = []
+    for record in records:
+        if len(record) > 0:
+            edges = parseEdges(record)
+            fingerprints.append(fingerprint(size, edges[:, 0], edges[:, 1], edges[:, 2]))
+    return fingerprints
+
+def runGraphTask(task):
+    # the size of the rainbow subgraph, and the measurements of the run if the task asks for them
+    mrsFunction, fileName, index, timed, traceMemory = task
+    graph = readTestGraph(fileName, index)
+    if not timed:
+        return mrsFunction(graph).n(), None
+    resultGraph, stats = instrumentation.measure(mrsFunction, graph, traceMemory)
+    stats["index"] = index
+    return resultGraph.n(), stats
+
+def readPartialResults(partialFile):
+    # results of single graphs that are logged but not yet written to the results csv
+    partial = {}
+    if os.path.isfile(partialFile):
+        file = open(partialFile, "r")
+        for line in file:
+            vals = line.strip().split(",")
+            if len(vals) == 4:
+                partial[(vals[0], vals[1], int(vals[2]))] = int(vals[3])
+        file.close()
+    return partial
+
+def readRecordedTests(outputFile):
+    # the (name, size, density, numColours) of the lines already in a results csv
+    recorded = set()
+    if os.path.isfile(outputFile):
+        file = open(outputFile, "r")
+        for line in file:
+            vals = line.strip().split(",")
+            if len(vals) >= 4:
+                recorded.add((vals[0], int(vals[1]), int(vals[2]), int(vals[3])))
+        file.close()
+    return recorded
+
+#will run all generated tests on graphs of size sizeMin to sizeMax (inclusive) with each of the mrsFunctions and write
+#the results to the matching outputFiles. Every (function, file, graph) is a separate task for a pool of workers processes
+#(workers=None uses every core, workers=1 runs in this process). Each finished graph is logged to outputFile.partial, so an
+#interrupted run picks up where it stopped: tests with a line in the results csv or a logged result are not run again.
+#If timingFiles are given, every run is measured and a line per graph that was run is written to the matching timing
+#csv. With traceMemory each graph is run once more under tracemalloc for the traced peak, which takes a lot longer;
+#the times always come from the run without it.
+#Given a result_cache.ResultCache, graphs the cache has a result for are not run again (when timings are asked for,
+#only cached results that were measured count), and a graph that appears more than once is only run once. Results
+#from the cache or the .partial log get no timing line, as their run was measured when it happened
+def runAllTests(mrsFunctions, outputFiles, sizeMin=10, sizeMax=1000, workers=None, chunksize=1, directory="EXAMPLE_Tests",
+                timingFiles=None, traceMemory=False, cache=None):
+    fileNames = list(testFileNames(sizeMin, sizeMax, directory))
+    parameters = {fileName: readTestParameters(fileName) for fileName in fileNames}
+    fingerprints = {}
+    timed = timingFiles is not None
+
+    tests = []
+    tasks = []
+    # the cache key of each task, and the other (function, file, graph) that get the result of the task with that key
+    taskKeys = []
+    duplicates = {}
+    cached = []
+    partials = []
+    for mrsFunction, outputFile in zip(mrsFunctions, outputFiles):
+        name = mrsFunction.__name__
+        recorded = readRecordedTests(outputFile)
+        partial = readPartialResults(outputFile + ".partial")
+        partials.append(partial)
+        for fileName in fileNames:
+            numGraphs, size, density, maxColour = parameters[fileName]
+            if (name, size, density, maxColour) in recorded:
+                continue
+            tests.append((mrsFunction, outputFile, partial, fileName))
+            for index in range(numGraphs):
+                if (name, fileName, index) in partial:
+                    continue
+                key = None
+                if cache is not None:
+                    if not fileName in fingerprints:
+                        fingerprints[fileName] = readTestFingerprints(fileName)
+                    key = cache.key(fingerprints[fileName][index], mrsFunction)
+                if key is not None:
+                    entry = cache.get(key)
+                    if entry is not None and (not timed or entry["stats"] is not None):
+                        cached.append((mrsFunction, fileName, index, entry["n"]))
+                        continue
+                    if key in duplicates:
+                        duplicates[key].append((mrsFunction, fileName, index))
+                        continue
+                    duplicates[key] = []
+                tasks.append((mrsFunction, fileName, index, timed, traceMemory))
+                taskKeys.append(key)
+
+    partialFiles = {outputFile: open(outputFile + ".partial", "a") for outputFile in outputFiles}
+    if timed:
+        timingFiles = {outputFile: open(timingFile, "a") for outputFile, timingFile in zip(outputFiles, timingFiles)}
+
+    def record(mrsFunction, fileName, index, result, stats):
+        outputFile = outputFiles[mrsFunctions.index(mrsFunction)]
+        partials[mrsFunctions.index(mrsFunction)][(mrsFunction.__name__, fileName, index)] = result
+        partialFile = partialFiles[outputFile]
+        partialFile.write(mrsFunction.__name__ + "," + fileName + "," + str(index) + "," + str(result) + "\n")
+        partialFile.flush()
+        if stats is not None:
+            numGraphs, size, density, maxColour = parameters[fileName]
+            timingFile = timingFiles[outputFile]
+            timingFile.write(",".join([mrsFunction.__name__, str(size), str(density), str(maxColour)] + ["" if stats[field] is None else str(stats[field]) for field in instrumentation.TIMING_FIELDS]) + "\n")
+            timingFile.flush()
+
+    executor = None
+    try:
+        for mrsFunction, fileName, index, result in cached:
+            record(mrsFunction, fileName, index, result, None)
+
+        # results come back in task order whatever order the workers finish them in
+        if workers == 1:
+            results = map(runGraphTask, tasks)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            results = executor.map(runGraphTask, tasks, chunksize=chunksize)
+        for task, key, (result, stats) in zip(tasks, taskKeys, results):
+            mrsFunction, fileName, index = task[:3]
+            record(mrsFunction, fileName, index, result, stats)
+            if key is not None:
+                cache.put(key, result, stats)
+                for duplicate in duplicates[key]:
+                    record(*duplicate, result, None)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        for partialFile in partialFiles.values():
+            partialFile.close()
+        if timed:
+            for timingFile in timingFiles.values():
+                timingFile.close()
+        if cache is not None:
+            cache.evict()
+
+    for mrsFunction, outputFile, partial, fileName in tests:
+        numGraphs, size, density, maxColour = parameters[fileName]
+        resultString = mrsFunction.__name__
+        resultString += "," + str(size)
+        resultString += "," + str(density)
+        resultString += "," + str(maxColour)
+        for index in range(numGraphs):
+            resultString += "," + str(partial[(mrsFunction.__name__, fileName, index)])
+        resultString += "\n"
+        resultFile = open(outputFile, "a")
+        resultFile.write(resultString)
+        resultFile.close()
+
+    # every logged result is in a results csv now
+    for outputFile in outputFiles:
+        os.remove(outputFile + ".partial")
+
+#will run all generated tests on graphs of size sizeMin to sizeMax (inclusive) and write the results to the results csv
+#mrsFunction should be a function that accepts exactly one parameter (the graph) and returns exactly a rainbow subgraph
+#Given an exactFile, the optimum of every graph of size up to exactSizeMax is found with ExactMRS and recorded there like
+#any other results, and the approximation ratios of mrsFunction are written to ratioFileName(outputFile). A cache is
+#passed on to runAllTests
+def runTests(mrsFunction, outputFile, sizeMin=10, sizeMax=1000, workers=None, chunksize=1, timingFile=None, traceMemory=False,
+             exactFile=None, exactSizeMax=50, cache=None):
+    runAllTests([mrsFunction], [outputFile], sizeMin, sizeMax, workers, chunksize,
+                timingFiles=None if timingFile is None else [timingFile], traceMemory=traceMemory, cache=cache)
+    if exactFile is not None:
+        runAllTests([ExactMRS], [exactFile], sizeMin, min(sizeMax, exactSizeMax), workers, chunksize, cache=cache)
+        writeApproximationRatios(outputFile, exactFile, ratioFileName(outputFile))
+
+def ratioFileName(outputFile):
+    return os.path.splitext(outputFile)[0] + "-ratios.csv"
+
+#each line of the ratio csv is a line of the results csv with the size of every rainbow subgraph divided by the optimum
+#for that graph; data sets without a line in the exact results csv are left out
+def writeApproximationRatios(outputFile, exactFile, ratioFile):
+    optima = {}
+    if os.path.isfile(exactFile):
+        file = open(exactFile, "r")
+        for line in file:
+            vals = line.strip().split(",")
+            if len(vals) >= 4:
+                optima[tuple(vals[1:4])] = [int(val) for val in vals[4:]]
+        file.close()
+
+    ratioLines = []
+    if os.path.isfile(outputFile):
+        file = open(outputFile, "r")
+        for line in file:
+            vals = line.strip().split(",")
+            if len(vals) >= 4 and tuple(vals[1:4]) in optima:
+                ratios = [int(val) / optimum for val, optimum in zip(vals[4:], optima[tuple(vals[1:4])])]
+                ratioLines.append(",".join(vals[:4] + [str(ratio) for ratio in ratios]) + "\n")
+        file.close()
+    file = open(ratioFile, "w")
+    file.writelines(ratioLines)
+    file.close()
+
+#the timing csvs are aggregated like the results: the average of every measurement by size, density and number of colours
+def produceTimingAnalysis(timingFileNames):
+    for timingFileName in timingFileNames:
+        file = open(timingFileName, "r")
+        lines = file.read().split("\n")
+        file.close()
+
+        name = None
+        timingsBy = {"size": {}, "density": {}, "colours": {}}
+        for line in lines:
+            if len(line) > 0:
+                vals = line.split(",")
+                if name is None:
+                    name = vals[0]
+                # the measurements after the graph index, which is not averaged; a blank is a measurement not taken
+                measurements = [float(val) if len(val) > 0 else None for val in vals[5:]]
+                for parameter, val in zip(("size", "density", "colours"), vals[1:4]):
+                    timingsBy[parameter].setdefault(int(val), []).append(measurements)
+
+        for parameter, timings in timingsBy.items():
+            analysisFile = open("EXAMPLE_results-analysis-timing-" + parameter + ".csv", "a")
+            for value in timings.keys():
+                columns = [[val for val in column if val is not None] for column in zip(*timings[value])]
+                averages = [str(mean(column)) if len(column) > 0 else "" for column in columns]
+                analysisFile.write(name + "," + str(value) + "," + ",".join(averages))
+                analysisFile.write("\n")
+            analysisFile.close()
+
+def produceAnalysis(fileNames, timingFileNames=()):
+    produceTimingAnalysis(timingFileNames)
     for fileName in fileNames:
         file = open(fileName, "r")
         resultString = file.read()
@@ -253,23 +630,30 @@ def produceAnalysis(fileNames):
             analysisFile.close()
 
 if __name__ == "__main__":
+    # "python3 Tests.py convert [directory]" writes binary copies of the text data sets
+    if len(sys.argv) > 1 and sys.argv[1] == "convert":
+        convertTests(sys.argv[2] if len(sys.argv) > 2 else "Tests")
+        sys.exit()
+    # "python3 Tests.py check-parallel FILE..." checks that the parallel Tirodkar sweep matches the sequential one
+    if len(sys.argv) > 1 and sys.argv[1] == "check-parallel":
+        for fileName in sys.argv[2:]:
+            checkParallelTirodkar(fileName)
+        sys.exit()
+
     if len(sys.argv) == 1:
-        tests = multiprocessing.Process(target= generateTests, args=(10,))
-        tests.start()
-        tests.join()
+        generateTests(10)
     else:
-        processes = []
-        for i in range(1, len(sys.argv)):
-            num = int(sys.argv[i])
-            process = multiprocessing.Process(target=generateTests, args=(num,))
-            processes.append(process)
-            process.start()
+        generateTests(*(int(arg) for arg in sys.argv[1:]))
 
-        for process in processes:
-            process.join()
+    # results of earlier runs are reused as long as the algorithms keep their version
+    cache = ResultCache("EXAMPLE_cache")
+    runAllTests([Koch2011, Camacho2010, Tirodkar2017], ["EXAMPLE-results-koch.csv", "EXAMPLE-results-comacho.csv", "EXAMPLE-results-tirodkar.csv"],
+                timingFiles=["EXAMPLE-timing-koch.csv", "EXAMPLE-timing-comacho.csv", "EXAMPLE-timing-tirodkar.csv"], cache=cache)
 
-    runTests(Koch2011, "EXAMPLE-results-koch.csv")
-    runTests(Camacho2010, "EXAMPLE-results-comacho.csv")
-    runTests(Tirodkar2017, "EXAMPLE-results-tirodkar.csv")
+    # the optima of the small graphs, to compare the algorithms against
+    runAllTests([ExactMRS], ["EXAMPLE-results-exact.csv"], sizeMax=50, cache=cache)
+    for outputFile in ["EXAMPLE-results-koch.csv", "EXAMPLE-results-comacho.csv", "EXAMPLE-results-tirodkar.csv"]:
+        writeApproximationRatios(outputFile, "EXAMPLE-results-exact.csv", ratioFileName(outputFile))
 
-    produceAnalysis(["EXAMPLE-results-koch.csv", "EXAMPLE-results-comacho.csv", "EXAMPLE-results-tirodkar.csv"])
\ No newline at end of file
+    produceAnalysis(["EXAMPLE-results-koch.csv", "EXAMPLE-results-comacho.csv", "EXAMPLE-results-tirodkar.csv"],
+                    ["EXAMPLE-timing-koch.csv", "EXAMPLE-timing-comacho.csv", "EXAMPLE-timing-tirodkar.csv"])
\ No newline at end of file
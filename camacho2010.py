@@ -1,6 +1,9 @@
-import copy
+import logging
 from max_matching import Match
 import Graph
+from instrumentation import phase
+
+logger = logging.getLogger(__name__)
 
 
 def find_first_appearance_of_colour(graph, c):
@@ -25,25 +28,27 @@ def find_adjacent_edges(graph, c1, c2):
 
 
 def match_colors_greedy(graph: Graph.Graph, colours):
-    print("----------------------------------")
     # construct colours matching graph
     p = graph.num_colours
     colours_edges = []
     colours_graph_paths = [[0 for _ in range(p)] for _ in range(p)]
-    print(f"{p} colors, size: {graph.n()}")
-    for i in range(p):
-        for j in range(i):
-            joined_vertices = graph.find_adjacent_vertices_with_colours(colours[i], colours[j])
-            if joined_vertices:
-                colours_edges.append((i, j))
-                colours_edges.append((j, i))
-                colours_graph_paths[i][j] = joined_vertices
-                colours_graph_paths[j][i] = joined_vertices
-
-    print(colours_edges)
+    logger.info("%s colors, size: %s", p, graph.n())
+    with phase("colour_adjacency"):
+        colour_adjacency = graph.colour_adjacency()
+        for i in range(p):
+            for j in range(i):
+                joined_vertices = colour_adjacency[colours[i]].get(colours[j])
+                if joined_vertices:
+                    colours_edges.append((i, j))
+                    colours_edges.append((j, i))
+                    colours_graph_paths[i][j] = joined_vertices
+                    colours_graph_paths[j][i] = joined_vertices
+
+    logger.debug("colour edges: %s", colours_edges)
     # do the matching
-    match = Match.from_edges(p, colours_edges)
-    match.maximum_matching()
+    with phase("matching"):
+        match = Match.from_edges(p, colours_edges)
+        match.maximum_matching()
     # construct MRS
     n = graph.n()
     graph_h_nodes = set()
@@ -58,26 +63,30 @@ def match_colors_greedy(graph: Graph.Graph, colours):
         else:
             not_matched_colours.append(node.index)
 
-    print(matched_colours)
+    logger.debug("matched colours: %s", matched_colours)
     for c1, c2 in matched_colours:
-        print(c1, c2)
         v1, v2, v3 = colours_graph_paths[c1][c2]
         graph_h_nodes.add(v1)
         graph_h_nodes.add(v2)
         graph_h_nodes.add(v3)
 
     for c in not_matched_colours:
-        edge = graph.colours[c].pop()
-        graph.colours[c].add(edge)
+        edge = graph.colours[colours[c]].pop()
+        graph.colours[colours[c]].add(edge)
         graph_h_nodes.add(edge.v1)
         graph_h_nodes.add(edge.v2)
 
-    print(f"result k = {len(graph_h_nodes)}, {graph_h_nodes}")
+    logger.info("result k = %s", len(graph_h_nodes))
+    logger.debug("result vertices: %s", graph_h_nodes)
     return graph_h_nodes
 
 
 def Camacho2010(graph: Graph.Graph):
     colors = graph.colours.keys()
     result = match_colors_greedy(graph, list(colors))
-    subgraph = graph.induced_sub_graph(result)
+    with phase("induced_sub_graph"):
+        subgraph = graph.induced_sub_graph(result)
     return subgraph
+
+
+Camacho2010.version = 1
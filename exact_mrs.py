@@ -0,0 +1,97 @@
+# An exact solver for the minimum rainbow subgraph problem, to measure the approximation algorithms against.
+# It is a branch and bound over vertex sets. Vertex sets are bitmasks over the positions of the vertices, and sets of
+# colours are colour masks. Every step takes the uncovered colour with the fewest edges and branches on the vertices
+# that each of its edges would add. A step with one new vertex is tried before any with two, and once a vertex has
+# been tried it is left out of the remaining branches of that step.
+# The best solution of the greedy algorithms is the starting upper bound. The lower bound counts how many more
+# vertices are needed to cover the remaining colours, and vertex sets that were already searched are not searched again.
+# This is exponential, so it is meant for the small data sets.
+
+import Graph
+from Koch2011 import Koch2011
+from camacho2010 import Camacho2010
+
+
+def ExactMRS(graph):
+    vertices = list(graph.vertices.values())
+    n = len(vertices)
+    position = {vertex.index: i for i, vertex in enumerate(vertices)}
+
+    # pair[i][j] is the colour mask of the edges between the vertices at positions i and j
+    pair = [[0] * n for _ in range(n)]
+    for edge in graph.edges:
+        i = position[edge.v1.index]
+        j = position[edge.v2.index]
+        pair[i][j] |= 1 << edge.colour
+        pair[j][i] |= 1 << edge.colour
+    vertex_colours = [0] * n
+    for i in range(n):
+        for j in range(n):
+            vertex_colours[i] |= pair[i][j]
+    full = Graph.colour_mask(graph.colours.keys())
+
+    # the pairs of vertices joined by an edge of each colour, as vertex masks (one vertex for a loop)
+    colour_pairs = {colour: [] for colour in Graph.mask_bits(full)}
+    for i in range(n):
+        for j in range(i, n):
+            for colour in Graph.mask_bits(pair[i][j]):
+                colour_pairs[colour].append((1 << i) | (1 << j))
+    branch_order = sorted(colour_pairs, key=lambda colour: len(colour_pairs[colour]))
+
+    # start from the smallest greedy solution
+    best = None
+    for greedy in (Koch2011, Camacho2010):
+        solution = [position[vertex.index] for vertex in greedy(graph).vertices.values()]
+        if best is None or len(solution) < len(best):
+            best = solution
+    seen = set()
+
+    def search(members, member_mask, covered, excluded):
+        nonlocal best
+        if covered == full:
+            if len(members) < len(best):
+                best = members
+            return
+        if member_mask in seen:
+            return
+        seen.add(member_mask)
+
+        # every colour still needed has an edge with a new endpoint, so the new vertices must together be
+        # incident to all of them; take the vertices incident to the most of them until they could be
+        uncovered = full & ~covered
+        needed = uncovered.bit_count()
+        unavailable = member_mask | excluded
+        gains = sorted(((vertex_colours[v] & uncovered).bit_count() for v in range(n) if not unavailable >> v & 1),
+                       reverse=True)
+        new_vertices = 0
+        for gain in gains:
+            if needed <= 0:
+                break
+            needed -= gain
+            new_vertices += 1
+        if needed > 0 or len(members) + new_vertices >= len(best):
+            return
+
+        colour = next(colour for colour in branch_order if uncovered >> colour & 1)
+        options = {pair_mask & ~member_mask for pair_mask in colour_pairs[colour]}
+        options = sorted(options, key=lambda new: (new.bit_count(), -sum(
+            (vertex_colours[v] & uncovered).bit_count() for v in Graph.mask_bits(new))))
+        for new in options:
+            if new & excluded:
+                continue
+            new_members = list(members)
+            new_covered = covered
+            for v in Graph.mask_bits(new):
+                new_members.append(v)
+                for u in new_members:
+                    new_covered |= pair[v][u]
+            search(new_members, member_mask | new, new_covered, excluded)
+            # every solution with this one new vertex has now been searched
+            if new.bit_count() == 1:
+                excluded |= new
+
+    search([], 0, 0, 0)
+    return graph.induced_sub_graph(graph.vertices_by_index(vertices[v].index for v in best))
+
+
+ExactMRS.version = 1
@@ -0,0 +1,127 @@
+# Optional measurements of single algorithm runs: wall and CPU time, peak memory, how often the graphs were
+# modified or copied, and the time spent in each phase of an algorithm. Nothing in here is used unless runTest or
+# runAllTests is asked for timings or a run is made inside tracing().
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import Graph
+from CompactGraph import CompactGraph
+
+COUNTED_METHODS = ("addEdge", "removeEdge", "copy")
+COUNTED_CLASSES = (Graph.Graph, Graph.GraphView, CompactGraph)
+
+# the columns of a timing csv line after the name and data set parameters; a measurement that was not taken is None,
+# and a blank in the csv
+TIMING_FIELDS = ("index", "n", "wall", "cpu", "peak_traced", "peak_rss") + tuple(name + "_calls" for name in COUNTED_METHODS)
+
+
+def _counting(method, counts, name):
+    def counted(*args, **kwargs):
+        counts[name] += 1
+        return method(*args, **kwargs)
+    return counted
+
+
+@contextmanager
+def counting_calls():
+    # counts the calls of the graph methods in COUNTED_METHODS while the block runs, by patching the classes
+    # that define them; this is not thread safe, so only one block may run in a process at a time
+    counts = dict.fromkeys(COUNTED_METHODS, 0)
+    patched = []
+    for cls in COUNTED_CLASSES:
+        for name in COUNTED_METHODS:
+            # only methods a class defines itself, so that a call through a subclass is not counted twice
+            if name in cls.__dict__:
+                method = cls.__dict__[name]
+                patched.append((cls, name, method))
+                setattr(cls, name, _counting(method, counts, name))
+    try:
+        yield counts
+    finally:
+        for cls, name, method in patched:
+            setattr(cls, name, method)
+
+
+def reset_peak_rss():
+    # restart the peak resident set size of this process from its current size; False where that is not
+    # possible (it needs Linux)
+    try:
+        file = open("/proc/self/clear_refs", "w")
+        file.write("5")
+        file.close()
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss():
+    # the peak resident set size of this process since the last reset_peak_rss(), in kilobytes
+    file = open("/proc/self/status", "r")
+    try:
+        for line in file:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    finally:
+        file.close()
+    return None
+
+
+# the phases recorded by the innermost tracing() block, or None when not tracing
+_trace = None
+
+
+@contextmanager
+def tracing():
+    # collects a record {"phase": name, "seconds": ..., **fields} for every phase() that ends inside the block
+    global _trace
+    previous = _trace
+    _trace = []
+    try:
+        yield _trace
+    finally:
+        _trace = previous
+
+
+@contextmanager
+def phase(name, **fields):
+    # a phase of an algorithm; it is only timed while tracing
+    if _trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _trace.append(dict(phase=name, seconds=time.perf_counter() - start, **fields))
+
+
+def measure(mrsFunction, graph, traceMemory=False):
+    # run mrsFunction on graph and return the result with a dict of the measurements, keyed like TIMING_FIELDS.
+    # peak_rss is the peak resident set size during the run, so it is right in a pool worker that runs many graphs,
+    # and None where the peak cannot be reset. tracemalloc slows the algorithms down a lot, so it never runs during
+    # the timed run: with traceMemory the algorithm is run a second time under tracemalloc for peak_traced,
+    # which is None otherwise
+    rssReset = reset_peak_rss()
+    with counting_calls() as counts:
+        wallStart = time.perf_counter()
+        cpuStart = time.process_time()
+        resultGraph = mrsFunction(graph)
+        cpu = time.process_time() - cpuStart
+        wall = time.perf_counter() - wallStart
+    peakRss = peak_rss() if rssReset else None
+
+    peakTraced = None
+    if traceMemory:
+        tracemalloc.start()
+        try:
+            mrsFunction(graph)
+            peakTraced = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    stats = {"n": resultGraph.n(), "wall": wall, "cpu": cpu, "peak_traced": peakTraced, "peak_rss": peakRss}
+    for name in COUNTED_METHODS:
+        stats[name + "_calls"] = counts[name]
+    return resultGraph, stats
@@ -0,0 +1,81 @@
+# An on-disk cache of the results of the algorithms, so that a run of the tests only runs the algorithms on the graphs
+# they have not seen. A result is keyed by a fingerprint of the graph, which is the same for identical graphs in
+# different data sets, and by the name and version of the algorithm. Only algorithms with a version attribute are
+# cached; raise it whenever a change to an algorithm can change its results.
+# Every entry is a small json file holding the size of the rainbow subgraph and the measurements of the run, if it
+# was measured. When the entries take up more than maxBytes, those used least recently are removed.
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+def fingerprint(size, v1, v2, colour):
+    # the sha256 of the canonical edge list of a graph: the number of vertices, then every edge as
+    # (smaller endpoint, larger endpoint, colour) in sorted order, so the order of the edges and of their endpoints does not matter
+    lower = np.minimum(v1, v2).astype("<i8")
+    upper = np.maximum(v1, v2).astype("<i8")
+    colour = np.asarray(colour, dtype="<i8")
+    order = np.lexsort((colour, upper, lower))
+    edges = np.stack([lower[order], upper[order], colour[order]], axis=1)
+    digest = hashlib.sha256(np.array([size], dtype="<i8").tobytes())
+    digest.update(np.ascontiguousarray(edges).tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+
+    def __init__(self, directory=".mrs-cache", maxBytes=64 << 20):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, graphFingerprint, mrsFunction):
+        # None for an algorithm without a version, whose results are never cached
+        version = getattr(mrsFunction, "version", None)
+        if version is None:
+            return None
+        return hashlib.sha256("\0".join([graphFingerprint, mrsFunction.__name__, str(version)]).encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        # the entry {"n": ..., "stats": ...} stored under key, or None; stats is None for a run that was not measured
+        path = self.path(key)
+        try:
+            file = open(path, "r")
+        except FileNotFoundError:
+            return None
+        try:
+            entry = json.load(file)
+        except ValueError:
+            return None
+        finally:
+            file.close()
+        # the modification time is the last use of an entry
+        os.utime(path)
+        return entry
+
+    def put(self, key, n, stats=None):
+        path = self.path(key)
+        file = open(path + ".tmp", "w")
+        json.dump({"n": n, "stats": stats}, file)
+        file.close()
+        os.replace(path + ".tmp", path)
+
+    def evict(self):
+        # remove the least recently used entries until the rest fit in maxBytes
+        entries = []
+        for fileName in os.listdir(self.directory):
+            if fileName.endswith(".json"):
+                status = os.stat(os.path.join(self.directory, fileName))
+                entries.append((status.st_mtime, status.st_size, fileName))
+        total = sum(size for _, size, _ in entries)
+        for _, size, fileName in sorted(entries):
+            if total <= self.maxBytes:
+                break
+            os.remove(os.path.join(self.directory, fileName))
+            total -= size
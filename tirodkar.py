@@ -1,19 +1,22 @@
-import copy
+import logging
 import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 import Graph
+from instrumentation import phase
+
+logger = logging.getLogger(__name__)
 
 
 def procedure_1(graph: Graph.Graph, k):
     half = int(k/2)
     edges = []
-    for colour in graph.colours.keys():
+    for colour in sorted(graph.colours.keys()):
         if len(graph.colours[colour]) == 0:
-            print(f"graph `{graph.name}` does not have any edge with colour `{colour}`, although it should")
+            logger.warning("graph `%s` does not have any edge with colour `%s`, although it should", graph.name, colour)
             continue
-        edge = graph.colours[colour].pop()
-        graph.colours[colour].add(edge)
-        edges.append(edge)
+        edges.append(Graph.first_edge(graph.colours[colour]))
 
     edges = edges[:min(half, len(edges))]
 
@@ -31,23 +34,26 @@ def procedure_1(graph: Graph.Graph, k):
 
 def procedure_2(graph: Graph.Graph, k):
 
-    graph = graph.copy()
-    g_prime = graph.copy()
+    graph = graph.view()
+    g_prime = graph.view()
     T = set()
     T_2 = set()
 
+    # the colour degree of a vertex is its colour degree into the whole graph
+    selector = g_prime.colour_degree_selector(g_prime.vertices.values())
     for _ in range(int(math.ceil(k/2))):
-        max_v = g_prime.max_colour_degree()
+        max_v = selector.argmax()
         T.add(max_v.index)
-        g_prime.remove_all_colours_incident_to_vertex(max_v)
+        selector.remove_colours(g_prime.remove_all_colours_incident_to_vertex(max_v))
 
     t_sub_graph_vertices = graph.vertices_by_index(T)
 
+    selector = graph.colour_degree_selector(t_sub_graph_vertices)
     for _ in range(int(k/2)):
 
-        max_v = graph.max_colour_degree_into_subgraph(t_sub_graph_vertices)
+        max_v = selector.argmax()
         T_2.add(max_v.index)
-        graph.remove_all_colours_incident_to_vertex(max_v)
+        selector.remove_colours(graph.remove_all_colours_incident_to_vertex(max_v))
 
     vertices = T.union(T_2)
 
@@ -59,29 +65,32 @@ def procedure_2(graph: Graph.Graph, k):
 
 
 def procedure_3_sub(graph: Graph.Graph, k, vertex_ind):
-    graph = graph.copy()
-    g_prime = graph.copy()
-    N_1 = graph.vertices[vertex_ind].neighbours
+    graph = graph.view()
+    g_prime = graph.view()
+    # by index, so that the selectors below break ties the same way in every process
+    N_1 = sorted(graph.vertex_neighbours(graph.vertices[vertex_ind]), key=lambda vertex: vertex.index)
     N_2 = set()
     for vertex in N_1:
-        N2 = N_2.union(vertex.neighbours)
+        N2 = N_2 | graph.vertex_neighbours(vertex)
 
     N_2.difference_update(N_1)
 
     P = set()
     Q = set()
+    selector = graph.colour_degree_selector(sub_vertices=N_1, from_vertices=N_2)
     for _ in range(int(math.ceil(k/2))):
-        max_v = graph.max_colour_degree_into_subgraph(sub_vertices=N_1, from_vertices=N_2)
+        max_v = selector.argmax()
         P.add(max_v.index)
-        graph.remove_all_colours_incident_to_vertex(max_v)
+        selector.remove_colours(graph.remove_all_colours_incident_to_vertex(max_v))
 
     p_sub_graph_vertices = g_prime.vertices_by_index(P)
     N_1_g_prime = g_prime.vertices_by_index([v.index for v in N_1])
 
+    selector = g_prime.colour_degree_selector(sub_vertices=p_sub_graph_vertices, from_vertices=N_1_g_prime)
     for _ in range(int(k/2)):
-        max_v = g_prime.max_colour_degree_into_subgraph(sub_vertices=p_sub_graph_vertices, from_vertices=N_1_g_prime)
+        max_v = selector.argmax()
         Q.add(max_v.index)
-        g_prime.remove_all_colours_incident_to_vertex(max_v)
+        selector.remove_colours(g_prime.remove_all_colours_incident_to_vertex(max_v))
 
     vertices = P.union(Q)
 
@@ -101,18 +110,18 @@ def procedure_3(graph, k, U=None):
         sub = procedure_3_sub(graph, k, v_ind)
         sub_graph_vertices = graph.vertices_by_index(sub)
 
-        colours_set = graph.distinct_colours_of_subgraph(sub_graph_vertices)
-        if len(colours_set) > max_colour_num:
+        colour_num = len(graph.coverage(sub_graph_vertices))
+        if colour_num > max_colour_num:
             max_sub_graph = sub
-            max_colour_num = len(colours_set)
+            max_colour_num = colour_num
 
     return max_sub_graph
 
 
 def procedure_4(graph, k):
     original = graph
-    graph = graph.copy()
-    g_prime = graph.copy()
+    graph = graph.view()
+    g_prime = graph.view()
     U = set()
     U_vertices = set()
     V_prime = set()
@@ -123,17 +132,19 @@ def procedure_4(graph, k):
         U.add(max_v.index)
         U_vertices.add(max_v)
 
+    selector = graph.colour_degree_selector(U_vertices)
     for _ in range(int(k / 2)):
-        max_v = graph.max_colour_degree_into_subgraph(U_vertices)
+        max_v = selector.argmax()
         V.add(max_v.index)
-        graph.remove_all_colours_incident_to_vertex(max_v)
+        selector.remove_colours(graph.remove_all_colours_incident_to_vertex(max_v))
 
     u_sub_graph_vertices = g_prime.vertices_by_index(U)
 
+    selector = g_prime.colour_degree_selector(u_sub_graph_vertices)
     for _ in range(int(k/2)):
-        max_v = g_prime.max_colour_degree_into_subgraph(u_sub_graph_vertices)
+        max_v = selector.argmax()
         V_prime.add(max_v.index)
-        g_prime.remove_all_colours_incident_to_vertex(max_v)
+        selector.remove_colours(g_prime.remove_all_colours_incident_to_vertex(max_v))
 
     vertices = U.union(V)
     for v_ind in original.vertices.keys():
@@ -148,9 +159,9 @@ def procedure_4(graph, k):
     sub_graph_vertices = original.vertices_by_index(vertices)
     sub_graph_vertices_prime = original.vertices_by_index(vertices_prime)
 
-    colours_set = original.distinct_colours_of_subgraph(sub_graph_vertices)
-    colours_set_prime = original.distinct_colours_of_subgraph(sub_graph_vertices_prime)
-    if len(colours_set) > len(colours_set_prime):
+    colour_num = len(original.coverage(sub_graph_vertices))
+    colour_num_prime = len(original.coverage(sub_graph_vertices_prime))
+    if colour_num > colour_num_prime:
         return vertices, U
     else:
         return vertices_prime, U
@@ -163,43 +174,102 @@ def tirodkar_procedure(graph, k):
     a3_ver = procedure_3(graph, k, U)
 
     vertices = max(a1_ver, a2_ver, a3_ver, a4_ver,
-                   key=lambda x: graph.distinct_colours_of_subgraph(graph.vertices_by_index(x)))
+                   key=lambda x: len(graph.coverage(graph.vertices_by_index(x))))
     return vertices
 
 
-def Tirodkar2017(graph: Graph.Graph):
-    print("----------------------------------")
+def sweep_k(graph, k, p, abandon=None):
+    # run the procedure with this k, and again on the colours still missing until all p are covered;
+    # returns None as soon as `abandon(size)` says a subgraph of the current size can no longer win
+    g_prime = graph.view()
+    sub_graph = tirodkar_procedure(g_prime, k)
+    coverage = graph.coverage(graph.vertices_by_index(sub_graph))
+    c = 1
+    while len(coverage) < p:
+        if abandon is not None and abandon(len(sub_graph)):
+            return None
+        logger.debug("iteration -> %s, the subgraph: %s", c, sub_graph)
+        c += 1
+        sub_graph_vertices = g_prime.vertices_by_index(sub_graph)
+        g_prime.remove_all_colours_in_sub_graph(sub_graph_vertices)
+        new_it = tirodkar_procedure(g_prime, k)
+        coverage.update(graph.vertices_by_index(new_it))
+        sub_graph = sub_graph.union(new_it)
+
+    return sub_graph
+
+
+# state of a worker process in the parallel k sweep, set up by _init_sweep_worker
+_sweep_graph = None
+_sweep_p = None
+_sweep_best = None
+_sweep_k_range = None
+
+
+# Results are ranked by (size, k) so that ties go to the smallest k, as in the sequential sweep.
+# The best rank found so far is shared between workers as the single integer size * k_range + k + 1;
+# the initial value n * k_range means only subgraphs smaller than the whole graph are accepted.
+def _rank(size, k):
+    return size * _sweep_k_range + k + 1
+
+
+def _init_sweep_worker(vertex_indices, edges, maxColour, p, best, k_range):
+    global _sweep_graph, _sweep_p, _sweep_best, _sweep_k_range
+    _sweep_graph = Graph.Graph.from_edges(vertex_indices, edges, maxColour)
+    _sweep_p = p
+    _sweep_best = best
+    _sweep_k_range = k_range
+
+
+def _sweep_worker(k):
+    # subgraphs have at least k vertices, so once the best size is below k this k cannot win
+    if _rank(k, k) > _sweep_best.value:
+        return None
+    sub_graph = sweep_k(_sweep_graph, k, _sweep_p, abandon=lambda size: _rank(size, k) > _sweep_best.value)
+    if sub_graph is None:
+        return None
+    with _sweep_best.get_lock():
+        if _rank(len(sub_graph), k) < _sweep_best.value:
+            _sweep_best.value = _rank(len(sub_graph), k)
+    return sub_graph
+
+
+def Tirodkar2017(graph: Graph.Graph, workers=None):
     p = graph.num_colours
     min_n_ver, max_n_ver = int(math.sqrt(p)), min(p * 2 + 1, graph.n())
-    print(f"{p} colors, min_k = {min_n_ver}, max_k = {max_n_ver}, size: {graph.n()}")
+    logger.info("%s colors, min_k = %s, max_k = %s, size: %s", p, min_n_ver, max_n_ver, graph.n())
     result_ver = None
     result_size = graph.n()
-    for k in range(min_n_ver, max_n_ver):
-        if k > result_size:
-            break
-        g_prime = graph.copy()
-        sub_graph = tirodkar_procedure(g_prime, k)
-        c = 1
-        while len(graph.distinct_colours_of_subgraph(graph.vertices_by_index(sub_graph))) < p:
-            # print(f"iteration -> {c}")
-            # print(f"g_prime colours: {g_prime.colours.keys()}")
-            # print(f"graph colours: {graph.colours.keys()}")
-            # print(f"distict colors of sub graph in g_prime: {g_prime.distinct_colours_of_subgraph(g_prime.vertices_by_index(sub_graph))}")
-            # print(f"distict colors of sub graph in graph: {graph.distinct_colours_of_subgraph(graph.vertices_by_index(sub_graph))}")
-            # print(f"the subgraph: {sub_graph}")
-            c += 1
-            sub_graph_vertices = g_prime.vertices_by_index(sub_graph)
-            g_prime.remove_all_colours_in_sub_graph(sub_graph_vertices)
-            new_it = tirodkar_procedure(g_prime, k)
-            sub_graph = sub_graph.union(new_it)
-
-        if len(sub_graph) < result_size:
-            result_size = len(sub_graph)
-            result_ver = sub_graph
-
-    print(f"result k = {result_size}, {result_ver}")
-    sub_graph = graph.induced_sub_graph(graph.vertices_by_index(result_ver))
-    print(list(sub_graph.vertices.values()), sub_graph.edges, sep="\n")
+    if workers is not None and workers > 1:
+        # spread the values of k over a process pool; each worker builds its own copy of the graph
+        k_range = max_n_ver + 1
+        best = multiprocessing.Value("q", graph.n() * k_range)
+        edges = [(edge.v1.index, edge.v2.index, edge.colour) for edge in graph.edges]
+        initargs = (list(graph.vertices.keys()), edges, graph.maxColour, p, best, k_range)
+        with phase("parallel_sweep", workers=workers), \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker, initargs=initargs) as pool:
+            for sub_graph in pool.map(_sweep_worker, range(min_n_ver, max_n_ver)):
+                if sub_graph is not None and len(sub_graph) < result_size:
+                    result_size = len(sub_graph)
+                    result_ver = sub_graph
+    else:
+        for k in range(min_n_ver, max_n_ver):
+            if k > result_size:
+                break
+            with phase("sweep", k=k):
+                sub_graph = sweep_k(graph, k, p)
+            if len(sub_graph) < result_size:
+                result_size = len(sub_graph)
+                result_ver = sub_graph
+
+    logger.info("result k = %s", result_size)
+    logger.debug("result vertices: %s", result_ver)
+    with phase("induced_sub_graph"):
+        sub_graph = graph.induced_sub_graph(graph.vertices_by_index(result_ver))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("result subgraph:\n%s\n%s", list(sub_graph.vertices.values()), sub_graph.edges)
 
     return sub_graph
 
+
+Tirodkar2017.version = 2